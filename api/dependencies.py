@@ -1,22 +1,172 @@
 
-from typing import Generator
-from sqlalchemy.orm import Session
-from core.database import SessionLocal
+import hashlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncGenerator
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import AsyncSessionLocal
+from models.contract_orm import ContractORM
 
-def get_db() -> Generator[Session, None, None]:
+if TYPE_CHECKING:
+    from services.analysis_pipeline import AnalysisPipeline
+    from services.clause_extraction import ClauseExtractionService
+    from services.document_retrieval import DocumentRetrievalService
+    from services.obligation_mapping import ObligationMappingService
+    from services.risk_scoring import RiskScoringService
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency to get a database session.
+    Dependency to get an async database session.
     
     Yields:
-        Session: SQLAlchemy database session
+        AsyncSession: SQLAlchemy async database session
         
     Usage:
         @app.get("/items/")
-        def read_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
+        async def read_items(db: AsyncSession = Depends(get_db)):
+            return (await db.execute(select(Item))).scalars().all()
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+async def get_contract(contract_id: int, db: AsyncSession = Depends(get_db)) -> ContractORM:
+    """
+    Dependency that loads a contract by ID or responds with a 404.
+
+    The potentially multi-MB `text` column and the precomputed `*_json` analysis
+    columns are deferred; endpoints load the one they need with
+    `await contract.awaitable_attrs.<column>`.
+
+    Args:
+        contract_id (int): The ID of the contract to load.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ContractORM: The contract, with its large columns not yet loaded.
+
+    Raises:
+        HTTPException: If the contract is not found.
+    """
+    contract = (
+        await db.execute(
+            select(ContractORM)
+            .options(
+                defer(ContractORM.text),
+                defer(ContractORM.clauses_json),
+                defer(ContractORM.obligations_json),
+                defer(ContractORM.rights_json),
+                defer(ContractORM.risk_json),
+                defer(ContractORM.embedding),
+            )
+            .where(ContractORM.id == contract_id)
+        )
+    ).scalar_one_or_none()
+    if contract is None:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    return contract
+
+
+ANALYSIS_CACHE_CONTROL = "private, max-age=60"
+
+
+class ContractETag:
+    """ETag of an analysis response, derived from the contract version and endpoint path."""
+
+    def __init__(self, value: str, not_modified: bool):
+        self.value = value
+        self.not_modified = not_modified
+
+    def not_modified_response(self) -> Response:
+        """Builds the empty 304 response for a client that already has this version."""
+        return Response(
+            status_code=304,
+            headers={"ETag": self.value, "Cache-Control": ANALYSIS_CACHE_CONTROL},
+        )
+
+    def json_response(self, content: Any) -> ORJSONResponse:
+        """
+        Serializes already-validated JSON content directly, skipping the endpoint's
+        `response_model` validation while keeping the caching headers.
+        """
+        return ORJSONResponse(
+            content=content,
+            headers={"ETag": self.value, "Cache-Control": ANALYSIS_CACHE_CONTROL},
+        )
+
+
+def get_contract_etag(
+    request: Request,
+    response: Response,
+    contract: ContractORM = Depends(get_contract),
+) -> ContractETag:
+    """
+    Dependency that computes the ETag for a read-only analysis endpoint.
+
+    Analysis results are pure functions of the contract text, so the ETag is a hash of
+    the contract's `updated_at` and the request path. It relies only on the row loaded by
+    `get_contract`, which lets an endpoint answer a matching `If-None-Match` with a 304
+    before the text is ever loaded.
+
+    Args:
+        request (Request): The incoming request.
+        response (Response): The outgoing response, which receives the caching headers.
+        contract (ContractORM): The contract being analyzed.
+
+    Returns:
+        ContractETag: The ETag, and whether the client's cached copy is still current.
+    """
+    version = f"{contract.updated_at}|{request.url.path}"
+    etag = f'"{hashlib.sha256(version.encode("utf-8")).hexdigest()}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ANALYSIS_CACHE_CONTROL
+
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return ContractETag(etag, etag in candidates or "*" in candidates)
+
+
+# Analysis services load spaCy pipelines and transformer models in __init__,
+# so each one is built once per process and shared across requests. Their
+# modules are imported on first use, so processes that never call an endpoint
+# needing a model don't pay for importing spaCy/transformers at startup.
+@lru_cache(maxsize=1)
+def get_clause_extraction_service() -> "ClauseExtractionService":
+    """Returns the shared clause extraction service."""
+    from services.clause_extraction import ClauseExtractionService
+    return ClauseExtractionService()
+
+
+@lru_cache(maxsize=1)
+def get_obligation_mapping_service() -> "ObligationMappingService":
+    """Returns the shared obligation mapping service."""
+    from services.obligation_mapping import ObligationMappingService
+    return ObligationMappingService()
+
+
+@lru_cache(maxsize=1)
+def get_risk_scoring_service() -> "RiskScoringService":
+    """Returns the shared risk scoring service."""
+    from services.risk_scoring import RiskScoringService
+    return RiskScoringService()
+
+
+@lru_cache(maxsize=1)
+def get_document_retrieval_service() -> "DocumentRetrievalService":
+    """Returns the shared document retrieval service."""
+    from services.document_retrieval import DocumentRetrievalService
+    return DocumentRetrievalService()
+
+
+@lru_cache(maxsize=1)
+def get_analysis_pipeline() -> "AnalysisPipeline":
+    """Returns the shared analysis pipeline, built on the shared services."""
+    from services.analysis_pipeline import AnalysisPipeline
+    return AnalysisPipeline(
+        get_clause_extraction_service(),
+        get_obligation_mapping_service(),
+        get_risk_scoring_service(),
+    )
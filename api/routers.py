@@ -1,7 +1,8 @@
 from typing import List, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from kombu.exceptions import OperationalError as BrokerError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.security import get_current_user, User
 from api import dependencies
@@ -11,10 +12,6 @@ from models.legal_memo import LegalMemo
 from models.obligation import Obligation
 from models.right import Right
 from models.risk_report import RiskReport
-from services.clause_extraction import ClauseExtractionService
-from services.document_metadata import get_document_metadata
-from services.obligation_mapping import ObligationMappingService
-from services.risk_scoring import RiskScoringService
 from core.config import settings
 from utils.logging import logger
 from fastapi.responses import JSONResponse
@@ -25,23 +22,35 @@ from sqlalchemy.pool import StaticPool
 from sqlalchemy.exc import SQLAlchemyError
 from api.dependencies import get_db
 from services.document_ingestion import ingest_document, IngestionError
-from models.contract import Contract as ContractModel  # Renamed to avoid collision
-from services.document_retrieval import DocumentRetrievalService
+from models.contract_orm import ContractORM as ContractModel  # Renamed to avoid collision
+import asyncio
+import contextlib
 import os
-from services.document_upload import process_uploaded_file
+import tempfile
+from pathlib import Path
+import aiofiles
+from services.document_upload import process_uploaded_file, process_uploaded_files_bulk
 from services.analyze_contract_risk import analyzeContractRisk, AnalyzeContractRiskInput, AnalyzeContractRiskOutput
 from services.document_metadata import DocumentMetadata
+from tasks import persist_contract_task
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB per read when streaming uploads to disk
+ALLOWED_UPLOAD_MIME_TYPES = frozenset({
+    "application/pdf",
+    "text/plain",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "text/csv",
+})
+
 
 # Ingestion Endpoints
 @router.post("/contracts", response_model=Contract, tags=["Ingestion"])
 async def upload_contract(
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    db: AsyncSession = Depends(dependencies.get_db),
 ):
     """
     Upload a contract document (PDF, DOCX, TXT) for analysis.
@@ -49,18 +58,17 @@ async def upload_contract(
 
     Args:
         file (UploadFile): The contract document to upload.
-        background_tasks (BackgroundTasks): The background tasks to run after the file is uploaded.
         current_user (User): The current user.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Contract: The contract object.
 
     Raises:
-        HTTPException: If the upload fails.
+        HTTPException: If the upload fails (400 for unusable files, 503 if the Celery broker is unreachable).
 
     To alter this endpoint:
-    1. Modify the file types accepted in the `file_type` variable.
+    1. Modify the file types accepted in `ALLOWED_UPLOAD_MIME_TYPES`.
     2. Change the `process_uploaded_file` function to perform additional preprocessing steps.
     3. Modify the `Contract` model to include additional metadata fields.
 
@@ -69,68 +77,126 @@ async def upload_contract(
     2. Improve the text normalization logic.
     3. Improve the PII redaction logic.
     """
+    staged: List[str] = []
     try:
-        file_content = await file.read()
-        if not file_content:
-            raise IngestionError("Uploaded file is empty.")
-
-        # Determine file type and process accordingly
-        file_type = file.content_type
-        if file_type not in ["application/pdf", "text/plain", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/csv"]:
-            raise IngestionError(f"Unsupported file type: {file_type}")
-
-        # Save the file temporarily
-        file_path = f"temp_files/{file.filename}"
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Ensure directory exists
-
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-
+        file_path = await _stage_upload(file, staged)
         contract = await process_uploaded_file(file_path, db)
 
-        background_tasks.add_task(
-            persist_contract, contract, db
-        )  # Persist in background
+        # Persist on a Celery worker; publishing blocks while kombu retries, so keep it off the event loop
+        await asyncio.to_thread(persist_contract_task.delay, contract.model_dump())
         return contract
     except IngestionError as e:
         logger.error(f"Ingestion failed: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+    except BrokerError as e:
+        logger.error(f"Could not queue contract for persistence: {e}")
+        raise HTTPException(
+            status_code=503, detail="Contract storage is temporarily unavailable. Please retry the upload."
+        )
     except Exception as e:
         logger.exception("Unexpected error during upload")  # Log the full exception
         raise HTTPException(
             status_code=500, detail="Internal server error during upload."
         )
+    finally:
+        await _remove_staged(staged)  # Never leave staged uploads behind
+
+
+@router.post("/contracts/bulk", response_model=List[Contract], tags=["Ingestion"])
+async def upload_contracts_bulk(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(dependencies.get_db),
+):
+    """
+    Upload several contract documents (PDF, DOCX, TXT) in one request.
+    Text extraction runs in parallel across worker processes, one file per core.
+
+    Args:
+        files (List[UploadFile]): The contract documents to upload.
+        current_user (User): The current user.
+        db (AsyncSession): The database session.
 
-def persist_contract(contract: Contract, db: Session):
-    """Persists the contract to the database."""
+    Returns:
+        List[Contract]: One contract per uploaded file, in upload order.
+
+    Raises:
+        HTTPException: If any upload fails (400 for unusable files, 503 if the Celery broker is unreachable).
+    """
+    staged: List[str] = []
     try:
-        db_contract = ContractModel(
-            text=contract.text,
-            metadata=contract.metadata,
-            created_at=contract.metadata.get("created_at"),
-        )  # Include created_at
-        db.add(db_contract)
-        db.commit()
-        db.refresh(db_contract)
-        logger.info(f"Contract persisted to database with ID: {db_contract.id}")
-    except SQLAlchemyError as e:
-        logger.error(f"Database error: {e}")
-        db.rollback()
-        raise
+        file_paths = [await _stage_upload(file, staged) for file in files]
+        contracts = await process_uploaded_files_bulk(file_paths, db)
+
+        for contract in contracts:
+            await asyncio.to_thread(persist_contract_task.delay, contract.model_dump())  # Persist on a Celery worker
+        return contracts
+    except IngestionError as e:
+        logger.error(f"Bulk ingestion failed: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except BrokerError as e:
+        logger.error(f"Could not queue contracts for persistence: {e}")
+        raise HTTPException(
+            status_code=503, detail="Contract storage is temporarily unavailable. Please retry the upload."
+        )
     except Exception as e:
-        logger.exception("Unexpected error during contract persistence")
-        db.rollback()
-        raise
+        logger.exception("Unexpected error during bulk upload")
+        raise HTTPException(
+            status_code=500, detail="Internal server error during upload."
+        )
+    finally:
+        await _remove_staged(staged)
+
+
+async def _stage_upload(file: UploadFile, staged: List[str]) -> str:
+    """
+    Validates an upload and streams it to a temporary file under `settings.upload_dir`.
+    The path is added to `staged` as soon as the file exists, so the caller can remove
+    it even if streaming fails.
+    """
+    # Determine file type and process accordingly
+    file_type = file.content_type
+    if file_type not in ALLOWED_UPLOAD_MIME_TYPES:
+        raise IngestionError(f"Unsupported file type: {file_type}")
+
+    # Save the file temporarily under a random name so concurrent uploads with the
+    # same filename never collide; keep the suffix since extraction dispatches on it
+    suffix = Path(file.filename or "").suffix
+    with tempfile.NamedTemporaryFile(dir=settings.upload_dir, suffix=suffix, delete=False) as tmp:
+        file_path = tmp.name
+    staged.append(file_path)
+
+    # Stream the upload to disk in chunks so large documents never sit in memory whole
+    total_size = 0
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            await f.write(chunk)
+
+    if total_size == 0:
+        raise IngestionError("Uploaded file is empty.")
+    return file_path
+
+
+async def _remove_staged(file_paths: List[str]) -> None:
+    """Deletes staged upload files, ignoring any already gone."""
+    for file_path in file_paths:
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.remove, file_path)
 
 
 # Analysis Endpoints
 @router.get(
-    "/contracts/{contract_id}/clauses", response_model=List[Clause], tags=["Analysis"]
+    "/contracts/{contract_id}/clauses",
+    response_model=List[Clause],
+    response_model_exclude_unset=True,
+    tags=["Analysis"],
 )
 async def get_contract_clauses(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    etag: dependencies.ContractETag = Depends(dependencies.get_contract_etag),
 ):
     """
     Returns typed clauses, graph edges, and precision scores for a given contract.
@@ -138,7 +204,8 @@ async def get_contract_clauses(
     Args:
         contract_id (int): The ID of the contract to analyze.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        etag (ContractETag): The ETag of this response, used to answer conditional requests.
 
     Returns:
         List[Clause]: A list of clauses in the contract.
@@ -156,14 +223,16 @@ async def get_contract_clauses(
     2. Improve the cross-reference identification logic.
     3. Improve the clause typing logic.
     """
-    try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
+    if etag.not_modified:
+        return etag.not_modified_response()
 
-        clause_extraction_service = ClauseExtractionService()
-        clauses = clause_extraction_service.extract_clauses(contract.text)
-        return clauses
+    try:
+        stored = await contract.awaitable_attrs.clauses_json
+        if stored is not None:
+            return etag.json_response(stored)
+        contract_text = await contract.awaitable_attrs.text
+        analysis = await dependencies.get_analysis_pipeline().analyze(contract_id, contract_text)
+        return analysis.clauses
     except Exception as e:
         logger.exception(f"Error extracting clauses from contract {contract_id}")
         raise HTTPException(
@@ -174,12 +243,14 @@ async def get_contract_clauses(
 @router.get(
     "/contracts/{contract_id}/obligations",
     response_model=List[Obligation],
+    response_model_exclude_unset=True,
     tags=["Analysis"],
 )
 async def get_contract_obligations(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    etag: dependencies.ContractETag = Depends(dependencies.get_contract_etag),
 ):
     """
     Returns structured obligations/rights JSON for a given contract.
@@ -187,7 +258,8 @@ async def get_contract_obligations(
     Args:
         contract_id (int): The ID of the contract to analyze.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        etag (ContractETag): The ETag of this response, used to answer conditional requests.
 
     Returns:
         List[Obligation]: A list of obligations in the contract.
@@ -204,18 +276,16 @@ async def get_contract_obligations(
     1. Improve the obligation mapping logic.
     2. Improve the right mapping logic.
     """
-    try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
-
-        clause_extraction_service = ClauseExtractionService()
-        clauses = clause_extraction_service.extract_clauses(contract.text)
-
-        obligation_mapping_service = ObligationMappingService()
-        obligations, _ = obligation_mapping_service.map_obligations(clauses)  # Get obligations
+    if etag.not_modified:
+        return etag.not_modified_response()
 
-        return obligations
+    try:
+        stored = await contract.awaitable_attrs.obligations_json
+        if stored is not None:
+            return etag.json_response(stored)
+        contract_text = await contract.awaitable_attrs.text
+        analysis = await dependencies.get_analysis_pipeline().analyze(contract_id, contract_text)
+        return analysis.obligations
     except Exception as e:
         logger.exception(
             f"Error mapping obligations/rights for contract {contract_id}"
@@ -226,12 +296,16 @@ async def get_contract_obligations(
 
 
 @router.get(
-    "/contracts/{contract_id}/rights", response_model=List[Right], tags=["Analysis"]
+    "/contracts/{contract_id}/rights",
+    response_model=List[Right],
+    response_model_exclude_unset=True,
+    tags=["Analysis"],
 )
 async def get_contract_rights(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    etag: dependencies.ContractETag = Depends(dependencies.get_contract_etag),
 ):
     """
     Returns structured obligations/rights JSON for a given contract.
@@ -239,7 +313,8 @@ async def get_contract_rights(
     Args:
         contract_id (int): The ID of the contract to analyze.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        etag (ContractETag): The ETag of this response, used to answer conditional requests.
 
     Returns:
         List[Right]: A list of rights in the contract.
@@ -256,20 +331,16 @@ async def get_contract_rights(
     1. Improve the obligation mapping logic.
     2. Improve the right mapping logic.
     """
-    try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
+    if etag.not_modified:
+        return etag.not_modified_response()
 
-        clause_extraction_service = ClauseExtractionService()
-        clauses = clause_extraction_service.extract_clauses(contract.text)
-
-        obligation_mapping_service = ObligationMappingService()
-        _, rights = obligation_mapping_service.map_obligations(
-            clauses
-        )  # Get rights
-
-        return rights
+    try:
+        stored = await contract.awaitable_attrs.rights_json
+        if stored is not None:
+            return etag.json_response(stored)
+        contract_text = await contract.awaitable_attrs.text
+        analysis = await dependencies.get_analysis_pipeline().analyze(contract_id, contract_text)
+        return analysis.rights
     except Exception as e:
         logger.exception(
             f"Error mapping obligations/rights for contract {contract_id}"
@@ -280,12 +351,16 @@ async def get_contract_rights(
 
 
 @router.get(
-    "/contracts/{contract_id}/risk", response_model=RiskReport, tags=["Analysis"]
+    "/contracts/{contract_id}/risk",
+    response_model=RiskReport,
+    response_model_exclude_unset=True,
+    tags=["Analysis"],
 )
 async def get_contract_risk_report(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    etag: dependencies.ContractETag = Depends(dependencies.get_contract_etag),
 ):
     """
     Returns a per-clause and overall risk report with remediation suggestions and regulatory citations.
@@ -293,7 +368,8 @@ async def get_contract_risk_report(
     Args:
         contract_id (int): The ID of the contract to analyze.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        etag (ContractETag): The ETag of this response, used to answer conditional requests.
 
     Returns:
         RiskReport: The risk report for the contract.
@@ -311,18 +387,16 @@ async def get_contract_risk_report(
     2. Improve the regulatory citation logic.
     3. Improve the remediation suggestion logic.
     """
-    try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
-
-        clause_extraction_service = ClauseExtractionService()
-        clauses = clause_extraction_service.extract_clauses(contract.text)
-
-        risk_scoring_service = RiskScoringService()
-        risk_report = risk_scoring_service.score_clauses(clauses)
+    if etag.not_modified:
+        return etag.not_modified_response()
 
-        return risk_report
+    try:
+        stored = await contract.awaitable_attrs.risk_json
+        if stored is not None:
+            return etag.json_response(stored)
+        contract_text = await contract.awaitable_attrs.text
+        analysis = await dependencies.get_analysis_pipeline().analyze(contract_id, contract_text)
+        return analysis.risk_report
     except Exception as e:
         logger.exception(f"Error generating risk report for contract {contract_id}")
         raise HTTPException(
@@ -331,12 +405,16 @@ async def get_contract_risk_report(
 
 
 @router.get(
-    "/contracts/{contract_id}/metadata", response_model=DocumentMetadata, tags=["Analysis"]
+    "/contracts/{contract_id}/metadata",
+    response_model=DocumentMetadata,
+    response_model_exclude_unset=True,
+    tags=["Analysis"],
 )
 async def get_contract_metadata(
     contract_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    etag: dependencies.ContractETag = Depends(dependencies.get_contract_etag),
 ):
     """
     Returns the metadata of a contract.
@@ -344,7 +422,8 @@ async def get_contract_metadata(
     Args:
         contract_id (int): The ID of the contract to analyze.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        etag (ContractETag): The ETag of this response, used to answer conditional requests.
 
     Returns:
         DocumentMetadata: The metadata of the contract.
@@ -362,13 +441,13 @@ async def get_contract_metadata(
     2. Improve the date parsing logic.
     3. Improve the party identification logic.
     """
-    try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
+    if etag.not_modified:
+        return etag.not_modified_response()
 
-        metadata = await get_document_metadata(contract.text)
-        return metadata
+    try:
+        contract_text = await contract.awaitable_attrs.text
+        analysis = await dependencies.get_analysis_pipeline().analyze(contract_id, contract_text)
+        return analysis.metadata
     except Exception as e:
         logger.exception(f"Error extracting metadata for contract {contract_id}")
         raise HTTPException(
@@ -376,13 +455,17 @@ async def get_contract_metadata(
         )
 
 @router.get(
-    "/contracts/{contract_id}/compare", response_model=List[Contract], tags=["Analysis"]
+    "/contracts/{contract_id}/compare",
+    response_model=List[Contract],
+    response_model_exclude_unset=True,
+    tags=["Analysis"],
 )
 async def compare_contract(
     contract_id: int,
     num_results: int = 3,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(dependencies.get_db),
+    contract: ContractModel = Depends(dependencies.get_contract),
+    db: AsyncSession = Depends(dependencies.get_db),
 ):
     """
     Returns the top-N similar contracts from the database.
@@ -391,7 +474,8 @@ async def compare_contract(
         contract_id (int): The ID of the contract to compare.
         num_results (int): The number of similar contracts to return.
         current_user (User): The current user.
-        db (Session): The database session.
+        contract (ContractORM): The contract to analyze, with its text deferred.
+        db (AsyncSession): The database session.
 
     Returns:
         List[Contract]: A list of similar contracts.
@@ -409,12 +493,13 @@ async def compare_contract(
     2. Improve the filtering logic.
     """
     try:
-        contract = db.get(ContractModel, contract_id)
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
-
-        document_retrieval_service = DocumentRetrievalService()
-        similar_contracts = await document_retrieval_service.retrieve_similar_documents(contract.text, num_results)
+        # Contracts embedded at ingestion don't need their text re-encoded
+        embedding = await contract.awaitable_attrs.embedding
+        contract_text = await contract.awaitable_attrs.text if embedding is None else ""
+        document_retrieval_service = dependencies.get_document_retrieval_service()
+        similar_contracts = await document_retrieval_service.retrieve_similar_documents(
+            contract_text, num_results, db, exclude_id=contract_id, query_embedding=embedding
+        )
         return similar_contracts
     except Exception as e:
         logger.exception(f"Error retrieving similar contracts for contract {contract_id}")
@@ -1,35 +1,44 @@
 from pydantic_settings import BaseSettings
-from functools import lru_cache
-import os
-import logging
-from dotenv import load_dotenv
-
-load_dotenv()
 
 
 class Settings(BaseSettings):
+    """Application settings, read from the environment and `.env` by pydantic-settings."""
     app_name: str = "CounselAI-Pro"
     admin_email: str = "admin@example.com"
     google_genai_api_key: str = None  # Add this line
     items_per_user: int = 50
-    environment: str = os.getenv("ENVIRONMENT", "development")
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
-    jwt_secret: str = os.getenv("JWT_SECRET", "super-secret-jwt-key")
-    pii_encryption_key: str = os.getenv("PII_ENCRYPTION_KEY", "sixteen byte key")
-    database_url: str = os.getenv(
-        "DATABASE_URL", "sqlite:///./test.db"
-    )  # SQLite default for local dev
-    model_path: str = os.getenv("MODEL_PATH", "/models")
-    feature_flag_semantic_search: bool = os.getenv(
-        "FEATURE_FLAG_SEMANTIC_SEARCH", "false"
-    ).lower() == "true"
-    feature_flag_advanced_risk: bool = os.getenv(
-        "FEATURE_FLAG_ADVANCED_RISK", "false"
-    ).lower() == "true"
-    feature_flag_pii_detection: bool = os.getenv(
-        "FEATURE_FLAG_PII_DETECTION", "true"
-    ).lower() == "true"
-    enable_encryption: bool = os.getenv("ENABLE_ENCRYPTION", "false").lower() == "true"
+    environment: str = "development"
+    log_level: str = "INFO"
+    jwt_secret: str = "super-secret-jwt-key"
+    pii_encryption_key: str = "sixteen byte key"
+    database_url: str = "sqlite:///./app.db"  # SQLite default for local dev
+    # Connection pool tuning (ignored for SQLite). Size pool_size + max_overflow
+    # to roughly half of the server's max_connections per deployment.
+    database_pool_size: int = 20
+    database_max_overflow: int = 30
+    database_pool_timeout: int = 30
+    database_pool_recycle: int = 1800
+    model_path: str = "/models"
+    # Clause-type sequence classifier; point at a distilled model (e.g. DistilBERT fine-tuned on CUAD)
+    classifier_model: str = "cross-encoder/nli-distilroberta-base"
+    classifier_cache_dir: str = "/tmp/counselai_clf"  # Disk cache of clause classifier labels
+    sentence_segmenter: str = "senter"  # "senter" (statistical), or "sentencizer" (rule-based, fastest)
+    classifier_backend: str = "torch"  # "torch", or "onnx" to run the clause classifier on ONNX Runtime
+    risk_batch_wait_ms: int = 10  # How long the risk analyzer waits to batch concurrent requests; 0 disables
+    risk_backend: str = "torch"  # "torch", or "onnx" to run the risk analyzer on ONNX Runtime
+    embedding_backend: str = "torch"  # "torch", or "onnx" for the int8 ONNX Runtime embedding model
+    retrieval_index: str = "exact"  # "exact" dense scan, or "hnsw" for a faiss approximate index
+    torch_num_threads: int = 1  # Intra-op threads per process for CPU inference
+    spacy_n_process: int = 1  # Processes per spaCy nlp.pipe call; more only pays off for large batches of long texts
+    document_cache_dir: str = "/tmp/counselai_uploads"  # Disk cache of text extracted from uploads
+    embedding_cache_dir: str = "/tmp/counselai_emb"  # Disk cache of retrieval embeddings
+    segment_cache_dir: str = "/tmp/counselai_docs"  # Disk cache of sentence segmentation results
+    upload_dir: str = "temp_files"  # Created once at startup
+    celery_broker_url: str = "redis://localhost:6379/0"
+    feature_flag_semantic_search: bool = False
+    feature_flag_advanced_risk: bool = False
+    feature_flag_pii_detection: bool = True
+    enable_encryption: bool = False
     allowed_origins: list = ["*"]  # Configure CORS carefully in production
 
     model_config = {
@@ -38,15 +47,10 @@ class Settings(BaseSettings):
         "env_file": ".env"  # This is how you specify env file in v2
     }
 
-    DATABASE_URL: str = "sqlite:///./app.db"
-
-@lru_cache()
-def get_settings():
-    return Settings()
 
+settings = Settings()
 
-settings = get_settings()
 
-# Configure Logging (after settings are loaded)
-logging.basicConfig(level=settings.log_level, format="%(asctime)s - %(levelname)s - %(message)s")
-logger = logging.getLogger(__name__)
+def get_settings() -> Settings:
+    """Returns the process-wide settings, for use with `Depends()`."""
+    return settings
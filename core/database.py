@@ -1,23 +1,82 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
+_is_sqlite = settings.database_url.startswith("sqlite")
+
+# Pool sizing only applies to server databases; SQLite keeps its default pool.
+_pool_options = {"pool_pre_ping": True} if _is_sqlite else {
+    "pool_size": settings.database_pool_size,
+    "max_overflow": settings.database_max_overflow,
+    "pool_timeout": settings.database_pool_timeout,
+    "pool_recycle": settings.database_pool_recycle,
+    "pool_pre_ping": True,
+    # LIFO reuses a small hot set of connections and lets idle overflow age out.
+    "pool_use_lifo": True,
+}
+
 # Create SQLAlchemy engine
 engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+    settings.database_url,
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    **_pool_options,
+)
+
+
+def _async_database_url(url: str) -> str:
+    """Maps a sync database URL onto the matching asyncio driver (aiosqlite/asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg:", 1)
+    return url
+
+
+# Async engine used by request handlers, so DB calls don't block the event loop.
+# The sync engine above stays for DDL and the Celery worker.
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    **_pool_options,
 )
 
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Switches each new SQLite connection to WAL so readers don't block on the writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # Safe under WAL, and far fewer fsyncs
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+if _is_sqlite:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Create base class for models
+Base = declarative_base()
+
+# Create session factories
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+_tables_created = False
+
+
 def create_db_and_tables():
     """
     Creates database tables based on SQLAlchemy models.
     Call this during application startup to ensure tables exist.
     """
-    Base.metadata.create_all(bind=engine)
+    global _tables_created
+    if _tables_created:
+        return
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Importing the ORM modules registers their tables on Base.metadata
+    import models.contract_orm  # noqa: F401
 
-# Create base class for models
-Base = declarative_base()
\ No newline at end of file
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+    _tables_created = True
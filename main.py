@@ -1,19 +1,37 @@
 import asyncio
-import logging
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from core.config import settings
 from api.routers import router as api_router  # Import the router
-from api.dependencies import get_db
-from sqlalchemy.orm import Session
 from core.database import create_db_and_tables
+from services.document_upload import shutdown_process_pool
 from utils.logging import logger
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: create the upload directory and database tables.
+    DDL runs in a worker thread so the event loop isn't blocked while it runs.
+    Shutdown: stop the bulk ingestion worker processes.
+    """
+    logger.info("Starting up...")
+    Path(settings.upload_dir).mkdir(parents=True, exist_ok=True)  # Upload scratch space
+    await asyncio.to_thread(create_db_and_tables)  # Create tables if they don't exist
+    logger.info("Database tables created (if needed).")
+    yield
+    await asyncio.to_thread(shutdown_process_pool)
+
+
 app = FastAPI(
     title="CounselAI-Pro",
     version="0.1.0",
     description="A world-class legal contract analysis microservice.",
+    default_response_class=ORJSONResponse,  # orjson encodes large clause/risk payloads far faster
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -26,16 +44,6 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    Startup event: create database tables.
-    """
-    logger.info("Starting up...")
-    create_db_and_tables()  # Create tables if they don't exist
-    logger.info("Database tables created (if needed).")
-
-
 @app.get("/")
 async def root():
     return {"project": "CounselAI-Pro", "version": "0.1.0"}
@@ -47,7 +55,7 @@ app.include_router(api_router)  # Include the API router
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     logger.error(f"HTTPException: {exc.detail} (status code: {exc.status_code})")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail},
     )
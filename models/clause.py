@@ -1,13 +1,15 @@
+from dataclasses import dataclass, field
 from typing import List
 
-from pydantic import BaseModel
 
-
-class Clause(BaseModel):
+@dataclass(slots=True)
+class Clause:
     id: int
     type: str
     text: str
     precision_score: float
     risk_score: float
     references: List[str]
-    party: str
\ No newline at end of file
+    party: str
+    # IDs of the clauses that `references` resolve to, filled in by the clause graph
+    resolved_ids: List[int] = field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncAttrs
+
+from core.database import Base
+
+# JSONB on PostgreSQL, plain JSON elsewhere (SQLite in development)
+AnalysisJSON = JSON().with_variant(JSONB(), "postgresql")
+
+
+class ContractORM(AsyncAttrs, Base):
+    """
+    SQLAlchemy table backing persisted contracts.
+
+    `AsyncAttrs` lets async callers load deferred columns via `await contract.awaitable_attrs.text`.
+    The `*_json` columns hold analysis artifacts precomputed at ingestion; they stay
+    NULL until the worker has analyzed the contract. `embedding` is the contract's
+    normalized float16 sentence embedding, used for similarity search.
+    """
+
+    __tablename__ = "contracts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    text = Column(Text, nullable=False)
+    # `metadata` is reserved on declarative classes, so map it under another attribute name.
+    contract_metadata = Column("metadata", JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    clauses_json = Column(AnalysisJSON, nullable=True)
+    obligations_json = Column(AnalysisJSON, nullable=True)
+    rights_json = Column(AnalysisJSON, nullable=True)
+    risk_json = Column(AnalysisJSON, nullable=True)
+    embedding = Column(LargeBinary, nullable=True)
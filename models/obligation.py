@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 
-class Obligation(BaseModel):
+@dataclass(slots=True)
+class Obligation:
     party: str
     action: str
     condition: str
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 
-class Right(BaseModel):
+@dataclass(slots=True)
+class Right:
     party: str
     action: str
     condition: str
@@ -1,8 +1,10 @@
+from dataclasses import dataclass, field
 from typing import List, Dict
-from pydantic import BaseModel
 
-class RiskReport(BaseModel):
+@dataclass(slots=True)
+class RiskReport:
     clause_risks: List[Dict]
     overall_score: float
     compliance_score: float
-    suggestions: List[str]
\ No newline at end of file
+    suggestions: List[str]
+    negotiation_points: List[str] = field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from cachetools import TTLCache
+
+from models.clause import Clause
+from models.obligation import Obligation
+from models.right import Right
+from models.risk_report import RiskReport
+from services.clause_extraction import ClauseExtractionService
+from services.document_metadata import get_document_metadata
+from services.obligation_mapping import ObligationMappingService
+from services.risk_scoring import RiskScoringService
+from utils.logging import logger
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Every analysis artifact derived from a single contract text."""
+    clauses: List[Clause]
+    obligations: List[Obligation]
+    rights: List[Right]
+    risk_report: RiskReport
+    metadata: Dict
+
+
+class AnalysisPipeline:
+    """
+    Runs clause extraction, obligation/right mapping, risk scoring and metadata
+    extraction for a contract in one pass and caches the combined result, so the
+    per-artifact endpoints never re-run the NLP stages for the same text.
+
+    To alter this pipeline:
+    1. Add a new stage to `analyze` and a matching field to `AnalysisResult`.
+    2. Change the cache size or TTL passed to `__init__`.
+
+    To improve the performance of this pipeline:
+    1. Share intermediate NLP artifacts between stages.
+    2. Precompute the result at ingestion time.
+    """
+    def __init__(
+        self,
+        clause_extraction_service: ClauseExtractionService,
+        obligation_mapping_service: ObligationMappingService,
+        risk_scoring_service: RiskScoringService,
+        cache_size: int = 512,
+        cache_ttl: int = 600,
+    ):
+        self.clause_extraction_service = clause_extraction_service
+        self.obligation_mapping_service = obligation_mapping_service
+        self.risk_scoring_service = risk_scoring_service
+        # Results keyed by contract ID and text hash, so edited contracts are re-analyzed
+        self._cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    async def analyze(self, contract_id: int, text: str) -> AnalysisResult:
+        """
+        Returns every analysis artifact for a contract, computing them at most
+        once per contract text.
+
+        Args:
+            contract_id (int): The ID of the contract being analyzed.
+            text (str): The contract text.
+
+        Returns:
+            AnalysisResult: The clauses, obligations, rights, risk report and metadata.
+        """
+        key = self._cache_key(contract_id, text)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+
+        # The NLP stages are CPU-bound, so they run in worker threads off the event loop
+        clauses = await self.clause_extraction_service.extract_clauses_async(text)
+        obligations, rights = await asyncio.to_thread(self.obligation_mapping_service.map_obligations, clauses)
+        risk_report = await asyncio.to_thread(self.risk_scoring_service.score_clauses, clauses)
+        metadata = await get_document_metadata(text)
+
+        result = AnalysisResult(
+            clauses=clauses,
+            obligations=obligations,
+            rights=rights,
+            risk_report=risk_report,
+            metadata=metadata,
+        )
+        self._cache[key] = result
+        logger.info(f"Analysis pipeline completed for contract {contract_id}")
+        return result
+
+    @staticmethod
+    def _cache_key(contract_id: int, text: str) -> Tuple[int, str]:
+        return contract_id, hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -1,6 +1,22 @@
 from typing import List, Dict, Optional, Any, Union
+import ahocorasick
 from pydantic import BaseModel, Field
 
+# Trigger phrases whose presence rules out a risk item, as bit flags
+_HAS_INJUNCTIVE_RELIEF = 1 << 0
+_HAS_DATA_RETURN = 1 << 1
+
+# Every trigger phrase is found in a single pass over the contract text
+_TRIGGERS = ahocorasick.Automaton()
+for _phrase, _flag in (
+    ("injunctive relief", _HAS_INJUNCTIVE_RELIEF),
+    ("equitable remedies", _HAS_INJUNCTIVE_RELIEF),
+    ("return or destroy", _HAS_DATA_RETURN),
+    ("data retention", _HAS_DATA_RETURN),
+):
+    _TRIGGERS.add_word(_phrase, _flag)
+_TRIGGERS.make_automaton()
+
 class AnalyzeContractRiskInput(BaseModel):
     document_text: str = Field(..., description="The text content of the contract document.")
     contract_type: str = Field("NDA", description="The type of contract being analyzed.")
@@ -88,10 +104,12 @@ async def analyzeContractRisk(input_data: AnalyzeContractRiskInput) -> AnalyzeCo
     
     # Example risk items (similar to the TypeScript implementation)
     risk_items = []
-    contract_text = input_data.document_text.lower()
+    flags = 0
+    for _, flag in _TRIGGERS.iter(input_data.document_text.casefold()):
+        flags |= flag
     
     # 1. Missing Injunctive Relief (Priority 1)
-    if "injunctive relief" not in contract_text and "equitable remedies" not in contract_text:
+    if not flags & _HAS_INJUNCTIVE_RELIEF:
         risk_items.append(RiskItem(
             clause_text="Absence of Injunctive Relief Clause",
             risk_category="Enforcement",
@@ -103,7 +121,7 @@ async def analyzeContractRisk(input_data: AnalyzeContractRiskInput) -> AnalyzeCo
         ))
     
     # 2. Data Return/Destroy Timelines (Priority 2)
-    if "return or destroy" not in contract_text and "data retention" not in contract_text:
+    if not flags & _HAS_DATA_RETURN:
         risk_items.append(RiskItem(
             clause_text="Absence of Data Return/Destroy Clause",
             risk_category="Data Handling",
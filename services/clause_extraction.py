@@ -1,11 +1,61 @@
+import asyncio
+import hashlib
 import re
+from pathlib import Path
 from typing import List
+import ahocorasick
+import diskcache
 import spacy
+import torch
 from spacy.language import Language
 from models.clause import Clause
 from core.config import settings
+from utils.logging import logger
+from utils.onnx_models import load_ort_model, load_ort_tokenizer
 from transformers import pipeline
 
+# Segmentation only needs sentence boundaries: the small model's `senter` sets them
+# far faster than the parser, so everything else is excluded
+SEGMENTATION_MODEL = "en_core_web_sm"
+SEGMENTATION_EXCLUDED_PIPES = ["ner", "lemmatizer", "tagger", "attribute_ruler", "parser"]
+SEGMENTATION_BATCH_SIZE = 32
+CLASSIFICATION_BATCH_SIZE = 32
+CLASSIFIER_MODEL = settings.classifier_model  # Hugging Face id or local path of the clause-type classifier
+
+# Keyword -> clause type for the rule-based fallback, in priority order: the first
+# keyword present in a clause decides its type
+RULE_BASED_CLAUSE_KEYWORDS = [
+    ("shall", "obligation"),
+    ("may", "right"),
+    ("definition", "definition"),
+    ("means", "definition"),
+    ("warranty", "warranty"),
+    ("indemnify", "indemnity"),
+    ("limitation of liability", "limitation"),
+    ("governing law", "governing_law"),
+    ("dispute resolution", "dispute_resolution"),
+    ("force majeure", "force_majeure"),
+    ("assignment", "assignment"),
+    ("confidentiality", "confidentiality"),
+    ("intellectual property", "ip_license"),
+    ("ip license", "ip_license"),
+    ("termination", "termination"),
+    ("renewal", "renewal"),
+    ("exclusivity", "exclusivity"),
+    ("non-compete", "non_compete"),
+]
+
+# Placeholder risk weights; each keyword counts once however often it appears
+RISK_KEYWORD_WEIGHTS = {"liability": 0.3, "terminate": 0.2, "exclusive": 0.2}
+_RISK_RE = re.compile("|".join(RISK_KEYWORD_WEIGHTS))  # Matched against casefolded text
+
+# Clause delimiters (e.g., "1. ", "A. ", "(a)") at the start of a line, and header numbering
+_CLAUSE_DELIMITER_RE = re.compile(r"\n(?:\d+\.|[A-Z]\.|[a-z]\))\s")
+_HEADER_NUMBERING_RE = re.compile(r"^(?:\d+\.|[A-Z]\.|[a-z]\))")
+
+# Cross-references such as "Section 5.2" or "Clause 3a"; only the number is captured
+_SECTION_RE = re.compile(r"(?:Section|Clause)\s+(\d+(?:\.\d+)?(?:[a-z]+)?)")
+
 class ClauseExtractionService:
     """
     Extracts clauses from a contract text using NLP, classifies them, and
@@ -14,7 +64,7 @@ class ClauseExtractionService:
 
     To alter this service:
     1. Modify the `segment_text` function to use a different segmentation algorithm.
-    2. Change the `determine_clause_type` function to use a different classification model.
+    2. Change the `classify_clauses` function to use a different classification model.
     3. Modify the `find_clause_references` function to use a different cross-reference identification algorithm.
 
     To improve the accuracy of this service:
@@ -23,27 +73,58 @@ class ClauseExtractionService:
     3. Improve the cross-reference identification logic.
     """
     def __init__(self):
-        try:
-            self.nlp: Language = spacy.load("en_core_web_lg")
-            logger.info("spaCy model loaded successfully.")
-        except OSError:
-            logger.warning("Downloading en_core_web_lg spaCy model...")
-            spacy.cli.download("en_core_web_lg")
-            self.nlp: Language = spacy.load("en_core_web_lg")
-            logger.info("spaCy model downloaded and loaded.")
+        self.nlp: Language | None = None
+        if settings.sentence_segmenter == "senter":
+            try:
+                self.nlp = spacy.load(SEGMENTATION_MODEL, exclude=SEGMENTATION_EXCLUDED_PIPES)
+                self.nlp.enable_pipe("senter")
+                self._segmenter_id = f"{SEGMENTATION_MODEL}/senter"
+                logger.info("spaCy sentence segmenter loaded successfully.")
+            except (OSError, ValueError) as e:
+                logger.warning(f"{SEGMENTATION_MODEL} senter unavailable ({e}); using rule-based sentencizer.")
+
+        if self.nlp is None:
+            # Rule-based splitting on punctuation needs no trained model at all
+            self.nlp = spacy.blank("en")
+            self.nlp.add_pipe("sentencizer")
+            self._segmenter_id = "blank/sentencizer"
+
+        # Sentence splits keyed by segmenter and contract text, so re-analysis skips spaCy
+        self._segment_cache = diskcache.Cache(settings.segment_cache_dir, size_limit=2**30)
+
+        # All fallback keywords are matched in a single pass over the clause text
+        self._kw_automaton = ahocorasick.Automaton()
+        for priority, (keyword, clause_type) in enumerate(RULE_BASED_CLAUSE_KEYWORDS):
+            self._kw_automaton.add_word(keyword, (priority, clause_type))
+        self._kw_automaton.make_automaton()
 
         # Load a pre-trained transformer model for clause classification
-        try:
-            self.classifier = pipeline(
-                "text-classification",
-                model="cross-encoder/nli-distilroberta-base",  # CAUD Fine-tuned model (Example)
-                tokenizer="cross-encoder/nli-distilroberta-base",
-                device=0 if settings.environment != "development" else -1, # Use GPU if available
-            )
-            logger.info("Transformer classifier loaded successfully.")
-        except Exception as e:
-            logger.error(f"Error loading transformer classifier: {e}")
-            self.classifier = None
+        device = 0 if settings.environment != "development" else -1  # Use GPU if available
+        self._classifier_id = CLASSIFIER_MODEL
+        self.classifier = None
+        if settings.classifier_backend == "onnx":
+            self.classifier = self._load_onnx_classifier(device)
+
+        if self.classifier is None:
+            try:
+                self.classifier = pipeline(
+                    "text-classification",
+                    model=CLASSIFIER_MODEL,
+                    tokenizer=CLASSIFIER_MODEL,
+                    use_fast=True,
+                    device=device,
+                    batch_size=CLASSIFICATION_BATCH_SIZE,
+                )
+                logger.info("Transformer classifier loaded successfully.")
+            except Exception as e:
+                logger.error(f"Error loading transformer classifier: {e}")
+                self.classifier = None
+
+            if self.classifier and device == -1:
+                self._optimize_for_cpu()
+
+        # Classifier labels keyed by model and clause text, shared across processes and restarts
+        self._label_cache = diskcache.Cache(settings.classifier_cache_dir)
 
     def extract_clauses(self, text: str) -> List[Clause]:
         """
@@ -61,9 +142,19 @@ class ClauseExtractionService:
         clause_id = 0
         segments = self.segment_text(text)
 
+        # Boilerplate repeats heavily, so type and score each distinct text only once
+        unique_segments = list(dict.fromkeys(segments))
+        lowered = [segment.casefold() for segment in unique_segments]  # Shared by typing and scoring
+        type_by_text = dict(zip(unique_segments, self.classify_clauses(unique_segments, lowered)))
+        risk_by_text = {
+            segment: self.calculate_risk_score(text_lower)
+            for segment, text_lower in zip(unique_segments, lowered)
+        }
+        references_by_text = {segment: self.find_clause_references(segment) for segment in unique_segments}
+
         for segment_text in segments:
-            clause_type = self.determine_clause_type(segment_text)
-            risk_score = self.calculate_risk_score(segment_text)
+            clause_type = type_by_text[segment_text]
+            risk_score = risk_by_text[segment_text]
 
             clause = Clause(
                 id=clause_id,
@@ -71,7 +162,7 @@ class ClauseExtractionService:
                 text=segment_text,
                 precision_score=0.8,  # Placeholder
                 risk_score=risk_score,
-                references=self.find_clause_references(segment_text),
+                references=list(references_by_text[segment_text]),  # Copied; clauses don't share lists
                 party="Unknown",  # To be populated later
             )
             clauses.append(clause)
@@ -80,6 +171,19 @@ class ClauseExtractionService:
         self.build_clause_graph(clauses)
         return clauses
 
+    async def extract_clauses_async(self, text: str) -> List[Clause]:
+        """
+        Runs `extract_clauses` in a worker thread so the CPU-bound spaCy and
+        transformer work doesn't block the event loop.
+
+        Args:
+            text (str): The contract text to extract clauses from.
+
+        Returns:
+            List[Clause]: A list of Clause objects.
+        """
+        return await asyncio.to_thread(self.extract_clauses, text)
+
     def segment_text(self, text: str) -> List[str]:
         """
         Segments the contract text into clauses using regex, spaCy, and header detection.
@@ -90,24 +194,30 @@ class ClauseExtractionService:
         Returns:
             List[str]: A list of segments.
         """
+        cache_key = hashlib.sha256(f"{self._segmenter_id}\0{text}".encode("utf-8")).hexdigest()
+        cached = self._segment_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Split by common clause delimiters (e.g., "1. ", "A. ", "(a)")
-        clause_delimiters = r"\n(?:\d+\.|[A-Z]\.|[a-z]\))\s"
-        segments = re.split(clause_delimiters, text)
+        segments = _CLAUSE_DELIMITER_RE.split(text)
         segments = [s.strip() for s in segments if s.strip()]
 
-        # Further refine segmentation using spaCy to handle complex sentences and phrasing
+        # Further refine segmentation using spaCy to handle complex sentences and phrasing.
+        # Batching through nlp.pipe lets spaCy process many segments per call.
         refined_segments: List[str] = []
-        for segment in segments:
-            doc = self.nlp(segment)
+        for doc in self.nlp.pipe(segments, batch_size=SEGMENTATION_BATCH_SIZE, n_process=settings.spacy_n_process):
             for sent in doc.sents:
-                refined_segments.append(sent.text.strip())
+                sent_text = sent.text.strip()
+                if sent_text:
+                    refined_segments.append(sent_text)
 
+        self._segment_cache.set(cache_key, refined_segments)
         return refined_segments
 
     def determine_clause_type(self, text: str) -> str:
         """
-        Determines the type of a clause based on NLP and Transformer model.
-        Leverages self.is_clause_header to improve accuracy.
+        Determines the type of a single clause. See `classify_clauses`.
 
         Args:
             text (str): The clause text to determine the type of.
@@ -115,20 +225,139 @@ class ClauseExtractionService:
         Returns:
             str: The type of the clause.
         """
-        if self.is_clause_header(text):
-            return "header"  # Mark as header
+        return self.classify_clauses([text])[0]
+
+    def classify_clauses(self, texts: List[str], texts_lower: List[str] | None = None) -> List[str]:
+        """
+        Determines the types of clauses based on NLP and Transformer model.
+        Leverages self.is_clause_header to improve accuracy. Clauses with a
+        keyword hit are typed by `rule_based_clause_type` without a forward pass;
+        only the rest go through the classifier, in batches rather than one call each.
+
+        Args:
+            texts (List[str]): The clause texts to determine the types of.
+            texts_lower (List[str] | None): `texts` already casefolded, if the caller has them.
+
+        Returns:
+            List[str]: The type of each clause, in the same order as `texts`.
+        """
+        clause_types: List[str] = [""] * len(texts)
+        to_classify: List[int] = []
+        for i, text in enumerate(texts):
+            if self.is_clause_header(text):
+                clause_types[i] = "header"  # Mark as header
+                continue
+            text_lower = texts_lower[i] if texts_lower is not None else text.casefold()
+            clause_types[i] = self.rule_based_clause_type(text_lower)
+            if clause_types[i] == "unknown":
+                to_classify.append(i)  # No keyword hit; leave it to the model
 
-        if self.classifier:
+        if self.classifier and to_classify:
             try:
-                classification = self.classifier(text, truncation=True, max_length=512)
-                predicted_label = classification[0]["label"]
-                logger.debug(f"Clause classification: {predicted_label}")
-                return predicted_label
+                # Only clauses the model hasn't labelled before need a forward pass
+                keys = {i: self._label_cache_key(texts[i]) for i in to_classify}
+                misses: List[int] = []
+                for i in to_classify:
+                    label = self._label_cache.get(keys[i])
+                    if label is None:
+                        misses.append(i)
+                    else:
+                        clause_types[i] = label
+
+                if misses:
+                    classifications = self._bucketed_classify([texts[i] for i in misses])
+                    for i, classification in zip(misses, classifications):
+                        clause_types[i] = classification["label"]
+                        self._label_cache.set(keys[i], clause_types[i])
+                logger.debug("Classified %d clauses (%d cached)", len(misses), len(to_classify) - len(misses))
+                return clause_types
             except Exception as e:
-                logger.warning(f"Classification error: {e}.  Using rule-based fallback.")
-                return self.rule_based_clause_type(text)
-        else:
-            return self.rule_based_clause_type(text)
+                logger.warning(f"Classification error: {e}.  Leaving unmatched clauses as unknown.")
+                for i in to_classify:
+                    clause_types[i] = "unknown"
+        return clause_types
+
+    def _bucketed_classify(self, texts: List[str]) -> List[dict]:
+        """
+        Runs the classifier over `texts` sorted by token length, so each batch is
+        padded only to the length of similar-sized clauses rather than the
+        longest clause in the contract. Results are returned in input order.
+        """
+        lengths = self.classifier.tokenizer(
+            texts, truncation=True, max_length=512, return_length=True
+        )["length"]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        classifications = self.classifier(
+            [texts[i] for i in order],
+            batch_size=CLASSIFICATION_BATCH_SIZE,
+            truncation=True,
+            max_length=512,
+        )
+        results: List[dict] = [{}] * len(texts)
+        for i, classification in zip(order, classifications):
+            results[i] = classification
+        return results
+
+    def _label_cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._classifier_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load_onnx_classifier(self, device: int):
+        """
+        Loads the classifier as an ONNX Runtime session, exporting the model to
+        `settings.model_path` on first use (int8-quantized when running on CPU).
+        ORT fuses the transformer kernels and skips PyTorch's eager dispatch. Returns None if optimum/onnxruntime isn't
+        installed or loading fails, so the caller falls back to the torch pipeline.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from optimum.pipelines import pipeline as ort_pipeline
+        except ImportError:
+            logger.warning("optimum[onnxruntime] is not installed; using the torch classifier.")
+            return None
+
+        # One export per model, so switching CLASSIFIER_MODEL never loads a stale export
+        onnx_dir = Path(settings.model_path) / "clause_classifier_onnx" / CLASSIFIER_MODEL.replace("/", "--")
+        on_cpu = device < 0
+        provider = "CPUExecutionProvider" if on_cpu else "CUDAExecutionProvider"
+        try:
+            model = load_ort_model(
+                ORTModelForSequenceClassification, CLASSIFIER_MODEL, onnx_dir, provider, quantize=on_cpu
+            )
+            classifier = ort_pipeline(
+                "text-classification",
+                model=model,
+                tokenizer=load_ort_tokenizer(CLASSIFIER_MODEL, onnx_dir),
+                accelerator="ort",
+                batch_size=CLASSIFICATION_BATCH_SIZE,
+            )
+        except Exception as e:
+            logger.warning(f"Error loading ONNX classifier: {e}. Using the torch classifier.")
+            return None
+
+        self._classifier_id = f"{CLASSIFIER_MODEL}/onnx{'-int8' if on_cpu else ''}"
+        logger.info(f"ONNX Runtime classifier loaded ({provider}{', int8' if on_cpu else ''}).")
+        return classifier
+
+    def _optimize_for_cpu(self) -> None:
+        """
+        Pins torch to `settings.torch_num_threads` threads, so several server workers
+        don't oversubscribe the CPU, and swaps the classifier's Linear layers for
+        dynamically quantized int8 ones.
+        """
+        torch.set_num_threads(settings.torch_num_threads)
+        try:
+            torch.set_num_interop_threads(settings.torch_num_threads)
+        except RuntimeError:
+            pass  # Can only be set once per process, before any inter-op work
+
+        try:
+            self.classifier.model = torch.ao.quantization.quantize_dynamic(
+                self.classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self._classifier_id = f"{CLASSIFIER_MODEL}/int8"  # Quantized labels may differ slightly
+            logger.info("Transformer classifier quantized to int8.")
+        except Exception as e:
+            logger.warning(f"Classifier quantization failed: {e}. Using fp32 model.")
 
     def is_clause_header(self, text: str) -> bool:
         """
@@ -141,80 +370,38 @@ class ClauseExtractionService:
             bool: True if the text is a clause header, False otherwise.
         """
         # Check for common header patterns: uppercase, short length, numbering
-        if re.match(r"^(?:\d+\.|[A-Z]\.|[a-z]\))", text):
+        if _HEADER_NUMBERING_RE.match(text):
             return True
-        if len(text.split()) <= 5 and text.upper() == text:
+        # At most six pieces are split off: enough to tell "<= 5 words" without tokenizing the whole clause
+        if len(text.split(maxsplit=5)) <= 5 and text.upper() == text:
             return True
         return False
 
-    def rule_based_clause_type(self, text: str) -> str:
-        """Fallback rule-based clause typing."""
-        text = text.lower()
-        if "shall" in text:
-            return "obligation"
-        elif "may" in text:
-            return "right"
-        elif "definition" in text or "means" in text:
-            return "definition"
-        elif "warranty" in text:
-            return "warranty"
-        elif "indemnify" in text:
-            return "indemnity"
-        elif "limitation of liability" in text:
-            return "limitation"
-        elif "governing law" in text:
-            return "governing_law"
-        elif "dispute resolution" in text:
-            return "dispute_resolution"
-        elif "force majeure" in text:
-            return "force_majeure"
-        elif "assignment" in text:
-            return "assignment"
-        elif "confidentiality" in text:
-            return "confidentiality"
-        elif "intellectual property" in text or "ip license" in text:
-            return "ip_license"
-        elif "termination" in text:
-            return "termination"
-        elif "renewal" in text:
-            return "renewal"
-        elif "exclusivity" in text:
-            return "exclusivity"
-        elif "non-compete" in text:
-            return "non_compete"
-        else:
-            return "unknown"
-
-    def calculate_risk_score(self, text: str) -> float:
-        """Calculates a risk score (Placeholder - replace with ML model)."""
-        text = text.lower()
-        score = 0.0
-        if "liability" in text:
-            score += 0.3
-        if "terminate" in text:
-            score += 0.2
-        if "exclusive" in text:
-            score += 0.2
+    def rule_based_clause_type(self, text_lower: str) -> str:
+        """Fallback rule-based clause typing; expects casefolded text."""
+        best = None
+        for _, match in self._kw_automaton.iter(text_lower):
+            if best is None or match < best:
+                best = match
+        return best[1] if best else "unknown"
+
+    def calculate_risk_score(self, text_lower: str) -> float:
+        """Calculates a risk score from casefolded text (Placeholder - replace with ML model)."""
+        found = set(_RISK_RE.findall(text_lower))
+        score = sum((RISK_KEYWORD_WEIGHTS[keyword] for keyword in found), 0.0)
         return min(score, 1.0)
 
     def find_clause_references(self, text: str) -> List[str]:
         """Identifies cross-references to other clauses (e.g., "See Section 5.2")."""
-        references = []
-        for match in re.finditer(r"(?:Section|Clause)\s+(\d+(?:\.\d+)?(?:[a-z]+)?)", text):
-            references.append(match.group(1))
-        return references
+        return _SECTION_RE.findall(text)
 
     def build_clause_graph(self, clauses: List[Clause]) -> None:
-        """Builds a clause graph by identifying cross-references."""
+        """Builds a clause graph by resolving each clause's references to clause IDs."""
+        # Section numbers are 1-based while clause IDs start at 0
+        id_index = {str(c.id + 1): c.id for c in clauses}
         for clause in clauses:
+            # Naive matching - improve with more sophisticated methods
+            clause.resolved_ids = [id_index[ref] for ref in clause.references if ref in id_index]
             for ref in clause.references:
-                try:
-                    # Naive matching - improve with more sophisticated methods
-                    referenced_clause = next(
-                        c for c in clauses if str(c.id + 1) == ref
-                    )  # Changed to ID + 1 since clause IDs start at 0
-                    if referenced_clause:
-                        clause.references.append(str(referenced_clause.id))  # Store IDs
-                except StopIteration:
+                if ref not in id_index:
                     logger.warning(f"Reference to clause {ref} not found.")
-                    continue
@@ -2,9 +2,11 @@ from typing import Dict, Any
 import os
 from fastapi import UploadFile
 import tempfile
-import shutil
+import aiofiles
 from utils.logging import logger
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB per read when streaming uploads to disk
+
 # Custom exception for ingestion errors
 class IngestionError(Exception):
     """Exception raised for errors in the document ingestion process."""
@@ -26,9 +28,13 @@ async def ingest_document(file: UploadFile) -> Dict[str, Any]:
     try:
         # Create a temporary file to store the uploaded file
         with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
             temp_file_path = temp_file.name
 
+        # Stream the upload in chunks so the event loop is released between reads
+        async with aiofiles.open(temp_file_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
+
         # Extract file extension
         file_extension = os.path.splitext(file.filename)[1].lower() if file.filename else ""
         
@@ -68,8 +74,8 @@ async def extract_docx_content(file_path: str) -> str:
 async def extract_text_content(file_path: str) -> str:
     """Extracts content from a text file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            content = await f.read()
         return content
     except Exception as e:
         logger.error(f"Error extracting text content: {str(e)}")
@@ -1,13 +1,22 @@
 from typing import Dict, List
+import asyncio
 import re
-import spacy
-from spacy.language import Language
 from utils.logging import logger
 from typing_extensions import Dict, List, TypedDict
 
+# Patterns compiled once at import rather than looked up in re's cache on every call
+_DATE_RES = [
+    re.compile(r"\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\w+ \d{1,2},? \d{4}|\d{1,2} \w+,? \d{4})\b"),
+    re.compile(r"(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}"),
+]
+PARTY_KEYWORDS = ["Inc", "LLC", "Corp", "Company", "Ltd"]
+# One alternation finds every suffix in a single pass over the document
+_PARTY_RE = re.compile(r"(\w+ (?:" + "|".join(PARTY_KEYWORDS) + r"))")
+_GOVERNING_LAW_RE = re.compile(r"This Agreement shall be governed by and construed in accordance with the laws of (.*?)\.")
+_VENUE_RE = re.compile(r"any legal action or proceeding arising under this Agreement shall be brought exclusively in the federal or state courts located in (.*?)\.")
+_DEFINITION_RE = re.compile(r"\"(.*?)\"\s*means\s*(.*?)(?=\n|$)")
+_SLA_RE = re.compile(r"\bSLA\b")  # Matches "SLA" as a whole word
 
-# spaCy model for NLP tasks
-nlp: Language = spacy.load('en_core_web_lg')
 
 class DocumentMetadata(TypedDict):
     fileSize: int
@@ -30,13 +39,9 @@ def extract_dates(text: str) -> List[str]:
     Returns:
         List[str]: A list of detected dates.
     """
-    date_patterns = [
-        r"\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\w+ \d{1,2},? \d{4}|\d{1,2} \w+,? \d{4})\b",
-        r"(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}"
-    ]
     dates = []
-    for pattern in date_patterns:
-        dates.extend(re.findall(pattern, text))
+    for pattern in _DATE_RES:
+        dates.extend(pattern.findall(text))
     return dates
 
 def extract_parties(text: str) -> List[str]:
@@ -51,11 +56,7 @@ def extract_parties(text: str) -> List[str]:
         List[str]: A list of parties involved in the contract.
     """
     # Basic keyword-based approach (improve with NER)
-    party_keywords = ["Inc", "LLC", "Corp", "Company", "Ltd"]
-    parties = []
-    for keyword in party_keywords:
-        parties.extend(re.findall(r"(\w+ " + keyword + r")", text))
-    return parties
+    return _PARTY_RE.findall(text)
 
 def extract_governing_law(text: str) -> str | None:
     """
@@ -67,8 +68,7 @@ def extract_governing_law(text: str) -> str | None:
     Returns:
         str | None: The governing law, if found.
     """
-    pattern = r"This Agreement shall be governed by and construed in accordance with the laws of (.*?)\."
-    match = re.search(pattern, text)
+    match = _GOVERNING_LAW_RE.search(text)
     if match:
         return match.group(1)
     return None
@@ -83,8 +83,7 @@ def extract_venue(text: str) -> str | None:
     Returns:
         str | None: The venue for dispute resolution, if found.
     """
-    pattern = r"any legal action or proceeding arising under this Agreement shall be brought exclusively in the federal or state courts located in (.*?)\."
-    match = re.search(pattern, text)
+    match = _VENUE_RE.search(text)
     if match:
         return match.group(1)
     return None
@@ -99,8 +98,7 @@ def extract_definitions(text: str) -> Dict[str, str]:
     Returns:
         Dict[str, str]: A dictionary of definitions found in the contract.
     """
-    pattern = r"\"(.*?)\"\s*means\s*(.*?)(?=\n|$)"
-    definitions = dict(re.findall(pattern, text))
+    definitions = dict(_DEFINITION_RE.findall(text))
     return definitions
 
 def extract_sla_references(text: str) -> List[str]:
@@ -113,8 +111,7 @@ def extract_sla_references(text: str) -> List[str]:
     Returns:
         List[str]: A list of SLA references, if any.
     """
-    pattern = r"\bSLA\b"  # Matches "SLA" as a whole word
-    sla_references = re.findall(pattern, text)
+    sla_references = _SLA_RE.findall(text)
     return sla_references
 
 async def get_document_metadata(document: str) -> Dict:
@@ -140,6 +137,11 @@ async def get_document_metadata(document: str) -> Dict:
     5. Improve the definition extraction logic.
     6. Improve the SLA reference extraction logic.
     """
+    # The scans are CPU-bound; run them off the event loop
+    return await asyncio.to_thread(_extract_metadata, document)
+
+def _extract_metadata(document: str) -> Dict:
+    """Runs every metadata extractor over `document`."""
     file_size = len(document)  # Placeholder
     page_count = 1  # Placeholder
     word_count = len(document.split())
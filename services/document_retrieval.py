@@ -1,9 +1,65 @@
-from typing import List
-from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import List, Optional
+import diskcache
+import numpy as np
+import torch
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.contract import Contract
-from sentence_transformers import SentenceTransformer, util
+from models.contract_orm import ContractORM
+from sentence_transformers import SentenceTransformer
 from core.config import settings
 from utils.logging import logger
+from utils.onnx_models import load_ort_model, load_ort_tokenizer
+
+try:
+    import faiss
+except ImportError:  # Optional: only needed for RETRIEVAL_INDEX=hnsw
+    faiss = None
+
+ENCODE_BATCH_SIZE = 32  # Contract texts encoded per forward pass
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDING_MAX_SEQ_LENGTH = 384  # all-mpnet-base-v2's own limit
+HNSW_M = 32  # Graph neighbours per node
+HNSW_EF_CONSTRUCTION = 200
+EMBEDDING_DTYPE = np.float16  # Stored per contract; half the bytes of float32 at no ranking cost
+REFRESH_FETCH_SIZE = 1000  # Embeddings loaded per query when indexing new contracts
+
+
+class OnnxSentenceEncoder:
+    """
+    Minimal stand-in for `SentenceTransformer.encode` backed by an int8 ONNX Runtime
+    session. Reproduces all-mpnet-base-v2's mean pooling and L2 normalization.
+    """
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def encode(self, sentences, batch_size: int = ENCODE_BATCH_SIZE, convert_to_tensor: bool = False, **kwargs):
+        """Encodes one text or a list of texts into normalized sentence embeddings."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=EMBEDDING_MAX_SEQ_LENGTH,
+                return_tensors="pt",
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            batches.append(torch.nn.functional.normalize(pooled, p=2, dim=1))
+
+        embeddings = torch.cat(batches) if batches else torch.empty(0)
+        if single:
+            embeddings = embeddings[0]
+        return embeddings if convert_to_tensor else embeddings.numpy()
 
 class DocumentRetrievalService:
     """
@@ -19,22 +75,175 @@ class DocumentRetrievalService:
     2. Improve the filtering logic.
     """
     def __init__(self):
+        # Embedding matrix of every indexed contract, row-aligned with `_ids`
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix: Optional[np.ndarray] = None
+        # Contracts are embedded out of ID order by parallel workers, so track exactly which are indexed
+        self._indexed_ids: set = set()
+        self._refresh_lock = asyncio.Lock()  # Concurrent queries would otherwise index the same rows twice
+        # Approximate nearest-neighbour index over `_matrix`, when enabled and faiss is installed
+        self._use_hnsw = settings.retrieval_index == "hnsw" and faiss is not None
+        self._index = None
+        if settings.retrieval_index == "hnsw" and faiss is None:
+            logger.warning("faiss is not installed; using exact similarity search.")
+
+        self.model = None
+        self._embedder_id = EMBEDDING_MODEL
+        if settings.embedding_backend == "onnx":
+            self.model = self._load_onnx_encoder()
+            if self.model is not None:
+                self._embedder_id = f"{EMBEDDING_MODEL}/onnx-int8"
+
+        if self.model is None:
+            try:
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                self.model = SentenceTransformer('all-mpnet-base-v2', device=device)  # Or another suitable model
+                if device == "cuda":
+                    # FP16 halves the weight and activation traffic and runs on Tensor Cores;
+                    # embeddings are normalized and stored as float16 anyway
+                    self.model = self.model.half()
+                    self._embedder_id = f"{EMBEDDING_MODEL}/fp16"
+                logger.info(f"Sentence Transformer model loaded successfully on {device}.")
+            except Exception as e:
+                logger.error(f"Error loading Sentence Transformer model: {e}")
+                self.model = None
+
+        # Embeddings keyed by model and text, shared across processes and restarts
+        self._embedding_cache = diskcache.Cache(settings.embedding_cache_dir)
+
+    def _load_onnx_encoder(self) -> OnnxSentenceEncoder | None:
+        """
+        Loads the embedding model as an int8 ONNX Runtime session, exporting and
+        quantizing it under `settings.model_path` on first use. Returns None if
+        optimum/onnxruntime isn't installed or loading fails.
+        """
         try:
-            self.model = SentenceTransformer('all-mpnet-base-v2')  # Or another suitable model
-            logger.info("Sentence Transformer model loaded successfully.")
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+        except ImportError:
+            logger.warning("optimum[onnxruntime] is not installed; using SentenceTransformer.")
+            return None
+
+        onnx_dir = Path(settings.model_path) / "embedding_onnx"
+        try:
+            model = load_ort_model(
+                ORTModelForFeatureExtraction,
+                EMBEDDING_MODEL,
+                onnx_dir,
+                "CPUExecutionProvider",
+                quantize=True,
+            )
+            encoder = OnnxSentenceEncoder(model, load_ort_tokenizer(EMBEDDING_MODEL, onnx_dir))
         except Exception as e:
-            logger.error(f"Error loading Sentence Transformer model: {e}")
-            self.model = None
+            logger.warning(f"Error loading ONNX embedding model: {e}. Using SentenceTransformer.")
+            return None
 
-    async def retrieve_similar_documents(self, query: str, top_n: int = 3, db: Session = None) -> List[Contract]:
+        logger.info("ONNX Runtime int8 embedding model loaded successfully.")
+        return encoder
+
+    def embed(self, text: str) -> Optional[bytes]:
+        """
+        Encodes a contract text into the L2-normalized float16 embedding stored on
+        `ContractORM.embedding`, or None if the model isn't loaded. Texts embedded
+        before by the same model are served from the embedding cache.
+        """
+        if not self.model:
+            return None
+        cache_key = hashlib.sha256(f"{self._embedder_id}\0{text}".encode("utf-8")).hexdigest()
+        cached = self._embedding_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with torch.inference_mode():  # Stricter than encode's own no_grad: no version-counter bookkeeping
+            embedding = np.asarray(
+                self.model.encode(text, convert_to_tensor=False, normalize_embeddings=True), dtype=np.float32
+            )
+        embedding /= max(float(np.linalg.norm(embedding)), 1e-12)  # Re-normalize after any FP16 rounding
+        embedding_bytes = embedding.astype(EMBEDDING_DTYPE).tobytes()
+        self._embedding_cache.set(cache_key, embedding_bytes)
+        return embedding_bytes
+
+    async def _refresh_embeddings(self, db: AsyncSession) -> None:
+        """
+        Appends embeddings of contracts that gained one since the last query to the
+        in-memory matrix. Only IDs are scanned each time; embeddings are loaded for
+        contracts not indexed yet, whatever order they were embedded in.
+        """
+        async with self._refresh_lock:
+            embedded_ids = (
+                await db.execute(select(ContractORM.id).where(ContractORM.embedding.is_not(None)))
+            ).scalars().all()
+            missing = sorted(set(embedded_ids) - self._indexed_ids)
+            rows = []
+            for start in range(0, len(missing), REFRESH_FETCH_SIZE):
+                rows.extend(
+                    (
+                        await db.execute(
+                            select(ContractORM.id, ContractORM.embedding)
+                            .where(ContractORM.id.in_(missing[start:start + REFRESH_FETCH_SIZE]))
+                            .order_by(ContractORM.id)
+                        )
+                    ).all()
+                )
+            if rows:
+                self._append_embeddings(rows)  # One append, so the matrix is copied once per refresh
+
+    def _append_embeddings(self, rows) -> None:
+        """Adds `(id, embedding)` rows to the matrix, the ID list and the HNSW index."""
+        new_ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        # Widened to float32 once here so queries don't convert the whole matrix each time
+        new_matrix = np.vstack([np.frombuffer(row.embedding, dtype=EMBEDDING_DTYPE) for row in rows]).astype(np.float32)
+        if self._use_hnsw:
+            if self._index is None:
+                self._index = faiss.IndexHNSWFlat(new_matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+                self._index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            self._index.add(new_matrix)
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._matrix = new_matrix if self._matrix is None else np.vstack([self._matrix, new_matrix])
+        self._indexed_ids.update(int(contract_id) for contract_id in new_ids)
+
+    def _rank(self, query_vector: np.ndarray, top_n: int, exclude_id: Optional[int]) -> List[int]:
+        """Returns the IDs of the `top_n` contracts most similar to `query_vector`, best first."""
+        if top_n <= 0:
+            return []
+
+        if self._index is not None:
+            # HNSW search is sub-linear; ask for one extra hit in case it's the excluded contract
+            _, rows = self._index.search(query_vector.reshape(1, -1), top_n + 1)
+            ids = [int(self._ids[row]) for row in rows[0] if row >= 0]
+            return [contract_id for contract_id in ids if contract_id != exclude_id][:top_n]
+
+        scores = self._matrix @ query_vector
+        if exclude_id is not None:
+            scores[self._ids == exclude_id] = -np.inf
+
+        # Select the top-N without sorting every score
+        k = min(top_n, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [int(self._ids[i]) for i in top if np.isfinite(scores[i])]
+
+    async def retrieve_similar_documents(
+        self,
+        query: str,
+        top_n: int = 3,
+        db: AsyncSession = None,
+        exclude_id: Optional[int] = None,
+        query_embedding: Optional[bytes] = None,
+    ) -> List[Contract]:
         """
         Retrieves the top-N most similar documents to the given query from the database
         using semantic similarity search with Sentence Transformers.
 
+        Contract embeddings are computed once at ingestion and kept in memory, so a
+        query encodes only the query text and ranks every contract with one
+        matrix-vector product, or an HNSW search when `settings.retrieval_index` is "hnsw".
+
         Args:
             query (str): The query string to search for similar documents.
             top_n (int): The number of similar documents to return.
-            db (Session): The database session.
+            db (AsyncSession): The database session.
+            exclude_id (Optional[int]): A contract to leave out, e.g. the one being compared.
+            query_embedding (Optional[bytes]): A stored embedding of `query`, which skips encoding it.
 
         Returns:
             List[Contract]: A list of similar Contract objects.
@@ -44,32 +253,37 @@ class DocumentRetrievalService:
             return []
 
         try:
-            # 1. Encode the search query
-            query_embedding = self.model.encode(query, convert_to_tensor=True)
-
-            # 2. Fetch all contracts (or a reasonable subset) from the database
-            contracts: List[Contract] = db.query(Contract).all()  # Fetch all contracts
-
-            if not contracts:
+            # 1. Pick up contracts embedded since the last query
+            await self._refresh_embeddings(db)
+            if self._matrix is None:
                 logger.info("No contracts found in the database.")
                 return []
 
-            # 3. Encode the contract texts
-            contract_texts = [contract.text for contract in contracts]
-            contract_embeddings = self.model.encode(contract_texts, convert_to_tensor=True)
-
-            # 4. Calculate cosine similarity
-            cosine_scores = util.pytorch_cos_sim(query_embedding, contract_embeddings)[0]
-
-            # 5. Combine contracts and their scores
-            contract_scores = list(zip(contracts, cosine_scores.tolist()))
+            # 2. Encode the search query (in a worker thread, off the event loop); stored
+            # embeddings are normalized, so a dot product is the cosine
+            if query_embedding is None:
+                query_embedding = await asyncio.to_thread(self.embed, query)
+            query_vector = np.frombuffer(query_embedding, dtype=EMBEDDING_DTYPE)
 
-            # 6. Sort by similarity score
-            sorted_contracts = sorted(contract_scores, key=lambda x: x[1], reverse=True)
+            # 3. Rank the stored contracts against it
+            top_ids = self._rank(query_vector.astype(np.float32), top_n, exclude_id)
 
-            # 7. Return the top-N contracts
-            top_contracts = [contract for contract, score in sorted_contracts[:top_n]]
-            logger.info(f"Retrieved top {top_n} similar contracts.")
+            # 4. Load only the winning contracts, and only the columns returned; the embedding
+            # and analysis JSON columns are the largest data on the row
+            rows = (
+                await db.execute(
+                    select(ContractORM)
+                    .options(load_only(ContractORM.id, ContractORM.text, ContractORM.contract_metadata))
+                    .where(ContractORM.id.in_(top_ids))
+                )
+            ).scalars().all()
+            by_id = {row.id: row for row in rows}
+            top_contracts = [
+                Contract(id=row.id, text=row.text, metadata=row.contract_metadata or {})
+                for row in (by_id.get(contract_id) for contract_id in top_ids)
+                if row is not None
+            ]
+            logger.info(f"Retrieved top {len(top_contracts)} similar contracts.")
             return top_contracts
 
         except Exception as e:
@@ -1,9 +1,17 @@
+import asyncio
+import multiprocessing
 import os
 import io
-import pdfminer.high_level
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List
+import diskcache
+import pypdfium2
 from docx import Document
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.contract import Contract
 from core.config import settings
@@ -13,13 +21,35 @@ from services.document_metadata import get_document_metadata
 
 # This module handles the process of uploading and extracting text from various document types.
 
-async def process_uploaded_file(file_path: str, db: Session) -> Contract:
+# WordprocessingML tags read when streaming text straight out of a DOCX
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Run content and its text, as python-docx renders it (None: use the element's text);
+# breaks are "\n" only for line breaks, page and column breaks add nothing
+_DOCX_TEXT = {
+    f"{_W}t": None,
+    f"{_W}tab": "\t",
+    f"{_W}ptab": "\t",
+    f"{_W}cr": "\n",
+    f"{_W}noBreakHyphen": "-",
+}
+
+DIGEST_CHUNK_SIZE = 1 << 20  # 1 MiB per read when hashing an upload
+
+# Extracted text and metadata keyed by a hash of the uploaded file's bytes, so re-uploads skip parsing
+_document_cache = diskcache.Cache(settings.document_cache_dir)
+
+# Worker processes for bulk ingestion, started on first use
+_process_pool: ProcessPoolExecutor | None = None
+
+async def process_uploaded_file(file_path: str, db: AsyncSession, executor: Executor | None = None) -> Contract:
     """
     Processes an uploaded file (PDF, DOCX, TXT) to extract text and metadata.
+    The caller owns `file_path` and is responsible for removing it afterwards.
 
     Args:
         file_path (str): The path to the uploaded file.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
+        executor (Executor | None): Where text extraction runs; defaults to the event loop's thread pool.
 
     Returns:
         Contract: A Contract object containing the extracted text and metadata.
@@ -39,29 +69,80 @@ async def process_uploaded_file(file_path: str, db: Session) -> Contract:
     try:
         file_extension = os.path.splitext(file_path)[1].lower()
 
+        # Identical uploads (very common for contracts) reuse the earlier parse
+        cache_key = f"{file_extension}\0{await asyncio.to_thread(_file_digest, file_path)}"
+        cached = _document_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Document cache hit; skipping text extraction.")
+            return Contract(text=cached["text"], metadata=cached["metadata"], id=-1)
+
         if file_extension == ".pdf":
-            text = extract_text_from_pdf(file_path) # Calls function to extract text from PDF
+            extractor = extract_text_from_pdf # Extracts text from PDF
         elif file_extension == ".docx":
-            text = extract_text_from_docx(file_path) # Calls function to extract text from DOCX
+            extractor = extract_text_from_docx # Extracts text from DOCX
         elif file_extension == ".txt":
-            text = extract_text_from_txt(file_path) # Calls function to extract text from TXT
+            extractor = extract_text_from_txt # Extracts text from TXT
         else:
             raise IngestionError(f"Unsupported file type: {file_extension}")
 
+        # The extractors are blocking; parse in a worker so other requests keep running
+        text = await asyncio.get_running_loop().run_in_executor(executor, extractor, file_path)
+
         if not text:
             raise IngestionError("Could not extract text from the document.")
 
         metadata = await get_document_metadata(text)  # Extract metadata
+        _document_cache.set(cache_key, {"text": text, "metadata": metadata})
         contract = Contract(text=text, metadata=metadata, id=-1)  # Create contract
-
-        # Clean up temporary file
-        os.remove(file_path)
-
         return contract
     except Exception as e:
         logger.exception("Error processing uploaded file.")
         raise IngestionError(f"Error processing file: {e}")
 
+async def process_uploaded_files_bulk(file_paths: List[str], db: AsyncSession) -> List[Contract]:
+    """
+    Processes many uploaded files at once. Text extraction is CPU-bound and each
+    file is independent, so extraction fans out across one worker process per
+    core; cache lookups and metadata extraction stay in this process.
+
+    Args:
+        file_paths (List[str]): The paths to the uploaded files.
+        db (AsyncSession): The database session.
+
+    Returns:
+        List[Contract]: One Contract per file, in the same order as `file_paths`.
+
+    Raises:
+        IngestionError: If any file is unsupported or its text extraction fails.
+    """
+    pool = _get_process_pool()
+    return list(await asyncio.gather(*(process_uploaded_file(path, db, executor=pool) for path in file_paths)))
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Returns the bulk ingestion process pool, starting it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        # Spawned rather than forked: the server process holds model threads that don't survive fork
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+def shutdown_process_pool() -> None:
+    """Stops the bulk ingestion worker processes, if they were started; called on app shutdown."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+def _file_digest(file_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b""):  # hashlib.file_digest needs 3.11
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """Extracts text from a PDF file.
 
@@ -81,9 +162,19 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     2. Implement error handling for specific PDF extraction errors.
     """
     try:
-        with open(pdf_path, "rb") as file:
-            text = pdfminer.high_level.extract_text(file)
-        return text
+        # PDFium does the layout analysis in C++; pages are read one at a time and
+        # joined once at the end instead of growing a string per page
+        pdf = pypdfium2.PdfDocument(pdf_path)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_bounded())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return "\n".join(pages)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
         return ""
@@ -106,6 +197,11 @@ def extract_text_from_docx(docx_path: str) -> str:
     1. Implement error handling for specific DOCX extraction errors.
     2. Implement logic to handle different DOCX formatting styles.
     """
+    try:
+        return _stream_docx_text(docx_path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        logger.warning(f"Streaming DOCX parse failed: {e}. Falling back to python-docx.")
+
     try:
         document = Document(docx_path)
         text = "\n".join([paragraph.text for paragraph in document.paragraphs])
@@ -114,6 +210,51 @@ def extract_text_from_docx(docx_path: str) -> str:
         logger.error(f"Error extracting text from DOCX: {e}")
         return ""
 
+def _stream_docx_text(docx_path: str) -> str:
+    """
+    Streams paragraph text out of `word/document.xml` with iterparse, skipping
+    python-docx's object model but producing the same text as its
+    `document.paragraphs`: top-level paragraphs only (not tables or text boxes).
+    Each child of `w:body` is removed once read, so only the one being parsed
+    is held in memory.
+    """
+    paragraphs = []
+    body = None
+    depth = 0  # w:document is 1, w:body 2, its children 3
+    with zipfile.ZipFile(docx_path) as archive, archive.open("word/document.xml") as xml_file:
+        for event, element in ET.iterparse(xml_file, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2 and element.tag == f"{_W}body":
+                    body = element
+                continue
+            depth -= 1
+            if depth == 2 and body is not None:
+                if element.tag == f"{_W}p":
+                    paragraphs.append(_docx_paragraph_text(element))
+                body.remove(element)
+    return "\n".join(paragraphs)
+
+def _docx_paragraph_text(paragraph: ET.Element) -> str:
+    """Returns the text of a `w:p` from its runs, including runs inside hyperlinks."""
+    parts = []
+    for child in paragraph:
+        if child.tag == f"{_W}r":
+            runs = (child,)
+        elif child.tag == f"{_W}hyperlink":
+            runs = child.findall(f"{_W}r")
+        else:
+            continue
+        for run in runs:
+            for node in run:
+                if node.tag == f"{_W}br":
+                    if node.get(f"{_W}type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif node.tag in _DOCX_TEXT:
+                    text = _DOCX_TEXT[node.tag]
+                    parts.append(node.text or "" if text is None else text)
+    return "".join(parts)
+
 def extract_text_from_txt(txt_path: str) -> str:
     """Extracts text from a TXT file.
 
@@ -1,9 +1,13 @@
 from typing import List, Tuple
+from spacy.tokens import Doc
+from core.config import settings
 from models.clause import Clause
 from models.obligation import Obligation
 from models.right import Right
-import spacy
 from utils.logging import logger
+from utils.nlp import PARSER_ONLY_EXCLUDE, get_nlp
+
+NLP_BATCH_SIZE = 64  # Clauses parsed per spaCy batch
 
 class ObligationMappingService:
     """
@@ -19,14 +23,8 @@ class ObligationMappingService:
     2. Improve the obligation and right identification logic.
     """
     def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_lg")  # Ensure you have this model
-            logger.info("spaCy model loaded successfully for obligation mapping.")
-        except OSError:
-            logger.warning("Downloading en_core_web_lg spaCy model...")
-            spacy.cli.download("en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
-            logger.info("spaCy model downloaded and loaded for obligation mapping.")
+        # Only the dependency parse is read, so nothing else is loaded
+        self.nlp = get_nlp(exclude=PARSER_ONLY_EXCLUDE)
 
     def map_obligations(self, clauses: List[Clause]) -> Tuple[List[Obligation], List[Right]]:
         """
@@ -41,37 +39,45 @@ class ObligationMappingService:
         obligations: List[Obligation] = []
         rights: List[Right] = []
 
-        for clause in clauses:
+        # Only clauses that can yield a result are parsed, all in one batched pipe
+        candidates = [
+            clause for clause in clauses
+            if (clause.type == "obligation" and "shall" in clause.text.lower())
+            or (clause.type == "right" and "may" in clause.text.lower())
+        ]
+        docs = self.nlp.pipe(
+            (clause.text for clause in candidates), batch_size=NLP_BATCH_SIZE, n_process=settings.spacy_n_process
+        )
+        for clause, doc in zip(candidates, docs):
             if clause.type == "obligation":
-                obligation = self.extract_obligation(clause.text)
+                obligation = self.extract_obligation(doc)
                 if obligation:
                     obligations.append(obligation)
-            elif clause.type == "right":
-                right = self.extract_right(clause.text)
+            else:
+                right = self.extract_right(doc)
                 if right:
                     rights.append(right)
 
         return obligations, rights
 
-    def extract_obligation(self, clause_text: str) -> Obligation | None:
+    def extract_obligation(self, doc: Doc) -> Obligation | None:
         """
         Extracts obligation details from a clause using NLP.
         This is a placeholder and needs to be replaced with a proper information extraction model.
 
         Args:
-            clause_text (str): The text of the clause to extract obligation details from.
+            doc (Doc): The parsed clause to extract obligation details from.
 
         Returns:
             Obligation | None: An Obligation object, or None if no obligation is found.
         """
-        doc = self.nlp(clause_text)
         party = "Unknown"
         action = "Unknown"
         condition = "Unknown"
         due_date = "Unknown"
 
         # Example logic: looking for "shall" for obligations
-        if "shall" in clause_text.lower():
+        if "shall" in doc.text.lower():
             for token in doc:
                 if token.dep_ == "nsubj":
                     party = token.text
@@ -84,25 +90,24 @@ class ObligationMappingService:
         else:
             return None  # Not an obligation
 
-    def extract_right(self, clause_text: str) -> Right | None:
+    def extract_right(self, doc: Doc) -> Right | None:
         """
         Extracts right details from a clause using NLP.
         This is a placeholder and needs to be replaced with a proper information extraction model.
 
         Args:
-            clause_text (str): The text of the clause to extract right details from.
+            doc (Doc): The parsed clause to extract right details from.
 
         Returns:
             Right | None: A Right object, or None if no right is found.
         """
-        doc = self.nlp(clause_text)
         party = "Unknown"
         action = "Unknown"
         condition = "Unknown"
         due_date = "Unknown"
 
         # Example logic: looking for "may" for rights
-        if "may" in clause_text.lower():
+        if "may" in doc.text.lower():
             for token in doc:
                 if token.dep_ == "nsubj":
                     party = token.text
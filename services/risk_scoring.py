@@ -1,12 +1,84 @@
+from pathlib import Path
 from typing import List, Dict, Tuple
 from models.clause import Clause
 from models.risk_report import RiskReport
+import hashlib
+import queue
 import re
-import spacy
+import threading
+import time
+from concurrent.futures import Future
+import ahocorasick
+import numpy as np
+import torch
+from cachetools import LRUCache
 from utils.logging import logger
 from core.config import settings
+from utils.onnx_models import load_ort_model, load_ort_tokenizer
 from transformers import pipeline
 
+RISK_BATCH_SIZE = 32  # Clauses per risk analyzer forward pass
+RISK_CACHE_SIZE = 100_000  # Distinct clause texts whose scores are kept in memory
+RISK_WINDOW_MARGIN = 100  # Characters kept either side of the risk keywords sent to the analyzer
+# Generous upper bound on what 512 tokens cover; the tokenizer truncates the rest anyway,
+# so longer windows are cut here rather than tokenized in full first
+RISK_WINDOW_MAX_CHARS = 4000
+RISK_MODEL = "bhadresh-savani/distilbert-base-uncased-finetuned-ner"  # CAUD Fine-tuned model (Example)
+# Clause type -> (added risk, risk factor)
+CLAUSE_TYPE_RISK = {
+    "indemnity": (0.4, "Clause Type: Indemnity (High Risk)"),
+    "limitation": (0.3, "Clause Type: Limitation of Liability (Medium Risk)"),
+}
+
+class _AnalyzerBatcher:
+    """
+    Coalesces risk analyzer calls from concurrent requests into shared forward
+    passes. Callers block until their slice of the batch is ready; a single
+    worker thread waits up to `max_wait_s` for more texts once the first call
+    arrives, or until `max_batch_size` texts are queued, then runs the analyzer
+    once over all of them.
+    """
+    def __init__(self, analyzer, max_batch_size: int, max_wait_s: float):
+        self._analyzer = analyzer
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_s
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        threading.Thread(target=self._run, name="risk-analyzer-batcher", daemon=True).start()
+
+    def __call__(self, texts: List[str]) -> List[Dict]:
+        """Classifies `texts` as part of the next shared batch; re-raises the analyzer's errors."""
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _run(self) -> None:
+        """Drains the queue into batches forever."""
+        while True:
+            pending = [self._queue.get()]
+            queued = len(pending[0][0])
+            deadline = time.monotonic() + self._max_wait_s
+            while queued < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+                queued += len(pending[-1][0])
+
+            batch = [text for texts, _ in pending for text in texts]
+            try:
+                results = self._analyzer(batch, batch_size=RISK_BATCH_SIZE, truncation=True, max_length=512)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for texts, future in pending:
+                future.set_result(results[offset:offset + len(texts)])
+                offset += len(texts)
+
 class RiskScoringService:
     """
     Scores clauses and generates a risk report.
@@ -22,36 +94,94 @@ class RiskScoringService:
     3. Improve the remediation suggestion logic.
     """
     def __init__(self):
-         try:
-            self.nlp = spacy.load("en_core_web_lg")
-            logger.info("spaCy model loaded successfully for risk scoring.")
-         except OSError:
-            logger.warning("Downloading en_core_web_lg spaCy model...")
-            spacy.cli.download("en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
-            logger.info("spaCy model downloaded and loaded for risk scoring.")
-         # Load a pre-trained transformer model for risk assessment (CAUD Fine-tuned model example)
-         try:
-            self.risk_analyzer = pipeline(
+        # Load a pre-trained transformer model for risk assessment (CAUD Fine-tuned model example)
+        device = 0 if settings.environment != "development" else -1  # Use GPU if available
+        self.risk_analyzer = None
+        if settings.risk_backend == "onnx":
+            self.risk_analyzer = self._load_onnx_risk_analyzer(device)
+
+        if self.risk_analyzer is None:
+            try:
+                # DistilBERT holds up in half precision; on GPU that halves VRAM and runs on Tensor Cores
+                on_gpu = device >= 0 and torch.cuda.is_available()
+                self.risk_analyzer = pipeline(
+                    "text-classification",
+                    model=RISK_MODEL,
+                    tokenizer=RISK_MODEL,
+                    device=device,
+                    torch_dtype=torch.float16 if on_gpu else torch.float32,
+                )
+                logger.info(f"Transformer risk analyzer loaded successfully{' (fp16)' if on_gpu else ''}.")
+            except Exception as e:
+                logger.error(f"Error loading transformer risk analyzer: {e}")
+                self.risk_analyzer = None
+
+        # Shares forward passes between concurrent score_clauses calls (disabled at 0 ms)
+        self._batcher = None
+        if self.risk_analyzer and settings.risk_batch_wait_ms > 0:
+            self._batcher = _AnalyzerBatcher(self.risk_analyzer, RISK_BATCH_SIZE, settings.risk_batch_wait_ms / 1000)
+
+        # Expanded risk keywords (can load from file or DB for dynamic updates).
+        # Patterns are compiled once here and matched against lowercased clause text.
+        self.high_risk_keywords = ["sole discretion", "unilateral", "without notice", "absolute discretion", "indemnify", "hold harmless"]
+        self.medium_risk_keywords = ["may", "reasonable", "commercially reasonable", "material adverse", "best efforts"]
+        # One automaton over both keyword lists finds every hit in a single pass over the clause.
+        # Payloads carry each keyword's list position so factors keep their original order.
+        self._keyword_automaton = ahocorasick.Automaton()
+        weighted_keywords = [(keyword, 0.5, "High Risk") for keyword in self.high_risk_keywords]
+        weighted_keywords += [(keyword, 0.2, "Medium Risk") for keyword in self.medium_risk_keywords]
+        for order, (keyword, weight, label) in enumerate(weighted_keywords):
+            self._keyword_automaton.add_word(keyword, (order, keyword, weight, label))
+        self._keyword_automaton.make_automaton()
+        self.auto_renewal_patterns = [re.compile(p) for p in (r"automatically renew", r"unless notice is given")]
+        self.auto_renew_re = re.compile(r"automatically renew")
+        self.force_majeure_patterns = [re.compile(p) for p in (r"act of god", r"unforeseen circumstances")]
+        self.security_patterns = [re.compile(p) for p in (r"data breach", r"cybersecurity incident")]
+        self.data_privacy_patterns = [re.compile(p) for p in (r"personal data", r"personally identifiable information", r"pii")]
+        self.missing_injunctive_relief_pattern = re.compile(r"injunctive relief")
+        self.missing_liquidated_damages_pattern = re.compile(r"liquidated damages")
+
+        # (score, factors) per clause type and text; boilerplate clauses recur verbatim across contracts
+        self._risk_cache: LRUCache = LRUCache(maxsize=RISK_CACHE_SIZE)
+        self._risk_cache_lock = threading.Lock()  # score_clauses runs on worker threads
+
+    def _load_onnx_risk_analyzer(self, device: int):
+        """
+        Loads the risk model as an ONNX Runtime session, exporting it to
+        `settings.model_path` on first use (int8-quantized when running on CPU).
+        Returns None if optimum/onnxruntime isn't installed or loading fails, so
+        the caller falls back to the torch pipeline.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from optimum.pipelines import pipeline as ort_pipeline
+        except ImportError:
+            logger.warning("optimum[onnxruntime] is not installed; using the torch risk analyzer.")
+            return None
+
+        onnx_dir = Path(settings.model_path) / "risk_analyzer_onnx"
+        on_cpu = device < 0
+        provider = "CPUExecutionProvider" if on_cpu else "CUDAExecutionProvider"
+        try:
+            model = load_ort_model(
+                ORTModelForSequenceClassification,
+                RISK_MODEL,
+                onnx_dir,
+                provider,
+                quantize=on_cpu,
+            )
+            risk_analyzer = ort_pipeline(
                 "text-classification",
-                model="bhadresh-savani/distilbert-base-uncased-finetuned-ner",  # CAUD Fine-tuned model (Example)
-                tokenizer="bhadresh-savani/distilbert-base-uncased-finetuned-ner",
-                device=0 if settings.environment != "development" else -1,  # Use GPU if available
+                model=model,
+                tokenizer=load_ort_tokenizer(RISK_MODEL, onnx_dir),
+                accelerator="ort",
             )
-            logger.info("Transformer risk analyzer loaded successfully.")
-         except Exception as e:
-            logger.error(f"Error loading transformer risk analyzer: {e}")
-            self.risk_analyzer = None
-
-        # Expanded risk keywords (can load from file or DB for dynamic updates)
-            self.high_risk_keywords = ["sole discretion", "unilateral", "without notice", "absolute discretion", "indemnify", "hold harmless"]
-            self.medium_risk_keywords = ["may", "reasonable", "commercially reasonable", "material adverse", "best efforts"]
-            self.auto_renewal_patterns = [r"automatically renew", r"unless notice is given"]
-            self.force_majeure_patterns = [r"act of god", r"unforeseen circumstances"]
-            self.security_patterns = [r"data breach", r"cybersecurity incident"]
-            self.data_privacy_patterns = [r"personal data", r"personally identifiable information", r"pii"]
-            self.missing_injunctive_relief_pattern = r"injunctive relief"
-            self.missing_liquidated_damages_pattern = r"liquidated damages"
+        except Exception as e:
+            logger.warning(f"Error loading ONNX risk analyzer: {e}. Using the torch risk analyzer.")
+            return None
+
+        logger.info(f"ONNX Runtime risk analyzer loaded ({provider}{', int8' if on_cpu else ''}).")
+        return risk_analyzer
 
     def score_clauses(self, clauses: List[Clause]) -> RiskReport:
         """Scores clauses and generates a risk report."""
@@ -60,21 +190,21 @@ class RiskScoringService:
         compliance_score = 0.0
         suggestions = []
 
-        for clause in clauses:
-            clause_risk = self.calculate_clause_risk(clause)
+        # Lowercased once per clause and shared by every check below
+        texts_lower = [clause.text.lower() for clause in clauses]
+
+        results = self._cached_clause_risks(clauses, texts_lower)
+        for clause, (score, risk_factors) in zip(clauses, results):
             clause_risks.append(
                 {
                     "clause_id": clause.id,
-                    "risk_score": clause_risk["score"],
-                    "risk_factors": clause_risk["factors"],
+                    "risk_score": score,
+                    "risk_factors": list(risk_factors),
                 }
             )
-            overall_score += clause_risk["score"]
 
-        if len(clauses) > 0:
-            overall_score /= len(clauses)
-        else:
-            overall_score = 0
+        scores = np.fromiter((score for score, _ in results), dtype=np.float64, count=len(results))
+        overall_score = float(scores.mean()) if scores.size else 0.0
 
         # Calibrate overall score based on contract type (NDA vs MSA)
         overall_score = self.calibrate_overall_risk_score(overall_score, "MSA")  # Assuming MSA for this example
@@ -83,7 +213,7 @@ class RiskScoringService:
         suggestions = self.generate_suggestions(clauses, overall_score)
 
         # Prioritize key negotiation points
-        negotiation_points = self.get_negotiation_points(clauses)
+        negotiation_points = self.get_negotiation_points(clauses, texts_lower)
 
         return RiskReport(
             clause_risks=clause_risks,
@@ -93,73 +223,182 @@ class RiskScoringService:
             negotiation_points = negotiation_points, #add negotiation points
         )
 
-    def calculate_clause_risk(self, clause: Clause) -> Dict:
-        """Calculates the risk score for a single clause based on keywords and patterns."""
-        score = 0.0
-        risk_factors = []
-        text = clause.text.lower()
+    def assess_clauses(self, texts: List[str]) -> List[Dict | None]:
+        """
+        Runs the transformer risk analyzer over all clause texts in batches.
+        Returns one `{"label", "score"}` result per text, or None where the clause
+        wasn't assessed, so callers use keyword-based analysis for it. That is all
+        of them if the analyzer isn't loaded or fails.
 
-        # Use transformer model for initial risk assessment
-        if self.risk_analyzer:
-            try:
-                result = self.risk_analyzer(text, truncation=True, max_length=512)
-                risk_label = result[0]["label"]
-                risk_confidence = result[0]["score"]
-                logger.debug(f"Transformer risk assessment: {risk_label} with confidence {risk_confidence}")
-                if risk_label == "High Risk":
-                    score += risk_confidence  # Use confidence score to adjust
-                    risk_factors.append(f"Transformer: High Risk ({risk_confidence:.2f})")
-                elif risk_label == "Medium Risk":
-                    score += risk_confidence * 0.5
-                    risk_factors.append(f"Transformer: Medium Risk ({risk_confidence:.2f})")
-            except Exception as e:
-                logger.warning(f"Transformer risk analysis failed: {e}.  Using keyword-based analysis.")
-                # Fallback to keyword-based analysis if transformer fails
-                score, factors = self.keyword_based_risk(text)
-                risk_factors.extend(factors)
+        Only the window spanning a clause's risk keywords (plus a margin) is sent
+        to the model, and clauses without any keyword skip the model entirely;
+        attention cost grows quadratically with input length.
+        """
+        return self._assess_clauses(texts)[0]
+
+    def _assess_clauses(self, texts: List[str]) -> Tuple[List[Dict | None], bool]:
+        """Does the work of `assess_clauses`, also returning False if the analyzer call failed."""
+        assessments: List[Dict | None] = [None] * len(texts)
+        if not self.risk_analyzer or not texts:
+            return assessments, True
+
+        indices: List[int] = []
+        windows: List[str] = []
+        for i, text in enumerate(texts):
+            window = self._risk_window(text)
+            if window is not None:
+                indices.append(i)
+                windows.append(window)
+        if not windows:
+            return assessments, True
+
+        try:
+            if self._batcher is not None:
+                results = self._batcher(windows)
+            else:
+                results = self.risk_analyzer(windows, batch_size=RISK_BATCH_SIZE, truncation=True, max_length=512)
+        except Exception as e:
+            logger.warning(f"Transformer risk analysis failed: {e}.  Using keyword-based analysis.")
+            return assessments, False
+        for i, result in zip(indices, results):
+            assessments[i] = result
+        return assessments, True
+
+    def _risk_window(self, text: str) -> str | None:
+        """Returns the span of `text` around its risk keyword hits, or None if it has none."""
+        start, end = None, None
+        for last_index, (_, keyword, _, _) in self._keyword_automaton.iter(text):
+            hit_start = last_index - len(keyword) + 1
+            start = hit_start if start is None else min(start, hit_start)
+            end = last_index + 1 if end is None else max(end, last_index + 1)
+        if start is None:
+            return None
+        start = max(start - RISK_WINDOW_MARGIN, 0)
+        return text[start:min(end + RISK_WINDOW_MARGIN, start + RISK_WINDOW_MAX_CHARS)]
+
+    def _cached_clause_risks(self, clauses: List[Clause], texts_lower: List[str]) -> List[Tuple[float, tuple]]:
+        """
+        Returns each clause's (score, factors), scoring only clause texts not seen
+        before (in this or an earlier contract) and caching the new results.
+        Keyword-only fallback scores after a failed analyzer call aren't cached,
+        so those clauses get the transformer again next time.
+        """
+        keys = [self._risk_cache_key(clause.type, text) for clause, text in zip(clauses, texts_lower)]
+        results = {}
+        misses = {}
+        with self._risk_cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._risk_cache.get(key)
+                if cached is not None:
+                    results[key] = cached
+                elif key not in misses:
+                    misses[key] = i
+        if misses:
+            miss_clauses = [clauses[i] for i in misses.values()]
+            miss_texts = [texts_lower[i] for i in misses.values()]
+            # One batched transformer call for all new clauses instead of one per clause
+            assessments, assessed = self._assess_clauses(miss_texts)
+            miss_scores, miss_factors = self.score_columns(miss_clauses, miss_texts, assessments)
+            for key, score, risk_factors in zip(misses, miss_scores, miss_factors):
+                results[key] = (float(score), tuple(risk_factors))
+            if assessed:
+                with self._risk_cache_lock:
+                    for key in misses:
+                        self._risk_cache[key] = results[key]
+        return [results[key] for key in keys]
+
+    def _risk_cache_key(self, clause_type: str, text_lower: str) -> bytes:
+        return hashlib.blake2b(f"{clause_type}\0{text_lower}".encode("utf-8"), digest_size=16).digest()
+
+    def calculate_clause_risk(
+        self, clause: Clause, assessment: Dict | None = None, text_lower: str | None = None
+    ) -> Dict:
+        """
+        Calculates the risk score for a single clause based on keywords and patterns.
+        `assessment` is the clause's result from `assess_clauses`; when omitted the
+        clause is assessed on its own, through the same cache `score_clauses` uses.
+        `text_lower` is the clause text already lowercased.
+        """
+        text = text_lower if text_lower is not None else clause.text.lower()
+        if assessment is None:
+            score, risk_factors = self._cached_clause_risks([clause], [text])[0]
+            risk_factors = list(risk_factors)
         else:
-            score, factors = self.keyword_based_risk(text)
-            risk_factors.extend(factors)
+            scores, factors = self.score_columns([clause], [text], [assessment])
+            score, risk_factors = float(scores[0]), factors[0]
+        return {"score": score, "factors": risk_factors, "suggestions": self.generate_clause_suggestions(clause, text)}
+
+    def score_columns(
+        self, clauses: List[Clause], texts_lower: List[str], assessments: List[Dict | None]
+    ) -> Tuple[np.ndarray, List[List[str]]]:
+        """
+        Scores clauses one phase at a time across all of them (model or keyword
+        evidence, clause type, then each pattern group) rather than clause by clause.
+        Every phase adds into one score array; factors keep the per-clause order
+        the phases run in.
 
+        Args:
+            clauses (List[Clause]): The clauses to score.
+            texts_lower (List[str]): Each clause's text, lowercased.
+            assessments (List[Dict | None]): Each clause's result from `assess_clauses`.
 
-        # Additional checks
-        if clause.type == "indemnity":
-            score += 0.4
-            risk_factors.append("Clause Type: Indemnity (High Risk)")
-        elif clause.type == "limitation":
-            score += 0.3
-            risk_factors.append("Clause Type: Limitation of Liability (Medium Risk)")
+        Returns:
+            Tuple[np.ndarray, List[List[str]]]: The capped score and the risk factors of each clause.
+        """
+        count = len(clauses)
+        scores = np.zeros(count, dtype=np.float64)
+        factors: List[List[str]] = [[] for _ in range(count)]
 
-        if re.search(r"automatically renew", text):
-            score += 0.3
-            risk_factors.append("Auto-renewal Pattern Detected")
-        if any(pattern.search(text) for pattern in self.force_majeure_patterns):
-            score += 0.4
-            risk_factors.append("Force Majeure Pattern Detected")
-        if any(pattern.search(text) for pattern in self.security_patterns):
-            score += 0.5
-            risk_factors.append("Security/Data Breach Pattern Detected")
-        if any(pattern.search(text) for pattern in self.data_privacy_patterns):
-            score += 0.6
-            risk_factors.append("Data privacy/PII risk detected")
+        # Phase 1: transformer assessment, or keyword-based analysis where it's unavailable or failed
+        for i, (assessment, text) in enumerate(zip(assessments, texts_lower)):
+            if assessment is not None:
+                risk_label = assessment["label"]
+                risk_confidence = assessment["score"]
+                logger.debug("Transformer risk assessment: %s with confidence %s", risk_label, risk_confidence)
+                if risk_label == "High Risk":
+                    scores[i] += risk_confidence  # Use confidence score to adjust
+                    factors[i].append(f"Transformer: High Risk ({risk_confidence:.2f})")
+                elif risk_label == "Medium Risk":
+                    scores[i] += risk_confidence * 0.5
+                    factors[i].append(f"Transformer: Medium Risk ({risk_confidence:.2f})")
+            else:
+                keyword_score, keyword_factors = self.keyword_based_risk(text)
+                scores[i] += keyword_score
+                factors[i].extend(keyword_factors)
 
+        # Phase 2: clause type
+        for i, clause in enumerate(clauses):
+            if clause.type in CLAUSE_TYPE_RISK:
+                weight, factor = CLAUSE_TYPE_RISK[clause.type]
+                scores[i] += weight
+                factors[i].append(factor)
 
-        score = min(score, 1.0)  # Cap the score
+        # Phase 3: each pattern group over every clause
+        pattern_checks = [
+            ([self.auto_renew_re], 0.3, "Auto-renewal Pattern Detected"),
+            (self.force_majeure_patterns, 0.4, "Force Majeure Pattern Detected"),
+            (self.security_patterns, 0.5, "Security/Data Breach Pattern Detected"),
+            (self.data_privacy_patterns, 0.6, "Data privacy/PII risk detected"),
+        ]
+        for patterns, weight, factor in pattern_checks:
+            hits = np.fromiter(
+                (any(pattern.search(text) for pattern in patterns) for text in texts_lower), dtype=bool, count=count
+            )
+            scores[hits] += weight
+            for i in np.flatnonzero(hits):
+                factors[i].append(factor)
 
-        return {"score": score, "factors": risk_factors, "suggestions": self.generate_clause_suggestions(clause)}
+        np.minimum(scores, 1.0, out=scores)  # Cap the score
+        return scores, factors
 
     def keyword_based_risk(self, text: str) -> Tuple[float, List[str]]:
-        """Calculates risk based on keyword matching."""
+        """Calculates risk based on keyword matching; each keyword counts once."""
         score = 0.0
         factors = []
-        for keyword in self.high_risk_keywords:
-            if keyword in text:
-                score += 0.5
-                factors.append(f"Keyword: {keyword} (High Risk)")
-        for keyword in self.medium_risk_keywords:
-            if keyword in text:
-                score += 0.2
-                factors.append(f"Keyword: {keyword} (Medium Risk)")
+        hits = {match for _, match in self._keyword_automaton.iter(text)}
+        for _, keyword, weight, label in sorted(hits):
+            score += weight
+            factors.append(f"Keyword: {keyword} ({label})")
         return score, factors
 
     def calculate_compliance_score(self, overall_score: float) -> float:
@@ -175,9 +414,9 @@ class RiskScoringService:
         suggestions = []
         if overall_score > 0.6:
             suggestions.append("Consider seeking legal advice to review high-risk clauses.")
-        for clause in clauses:
-            if clause.risk_score > 0.8:
-                suggestions.append(f"Review clause {clause.id} due to high-risk keywords.")
+        risk_scores = np.fromiter((clause.risk_score for clause in clauses), dtype=np.float64, count=len(clauses))
+        for i in np.flatnonzero(risk_scores > 0.8):
+            suggestions.append(f"Review clause {clauses[i].id} due to high-risk keywords.")
         return suggestions
 
     def calibrate_overall_risk_score(self, score: float, contract_type: str) -> float:
@@ -188,10 +427,10 @@ class RiskScoringService:
             score = min(85, 70 + score * 15)  # MSA - Range between 70-85
         return score
 
-    def generate_clause_suggestions(self, clause: Clause) -> List[str]:
+    def generate_clause_suggestions(self, clause: Clause, text_lower: str | None = None) -> List[str]:
         """Generates specific suggestions for a clause based on identified risks."""
         suggestions = []
-        text = clause.text.lower()
+        text = text_lower if text_lower is not None else clause.text.lower()
 
         if "liability" in text:
             suggestions.append("Consider limiting liability to the extent permitted by law.")
@@ -199,32 +438,43 @@ class RiskScoringService:
             suggestions.append("Ensure termination rights are balanced and clearly defined.")
         if "exclusive" in text:
             suggestions.append("Review the scope and duration of exclusivity provisions.")
-        if re.search(self.missing_injunctive_relief_pattern, text) is None:
+        if self.missing_injunctive_relief_pattern.search(text) is None:
             suggestions.append("Consider adding an injunctive relief clause to protect confidential information.")
-        if re.search(self.missing_liquidated_damages_pattern, text) is None:
+        if self.missing_liquidated_damages_pattern.search(text) is None:
             suggestions.append("Consider adding a liquidated damages clause to address potential breaches.")
         return suggestions
 
-    def get_negotiation_points(self, clauses: List[Clause]) -> List[str]:
+    def get_negotiation_points(self, clauses: List[Clause], texts_lower: List[str] | None = None) -> List[str]:
         """Prioritizes key negotiation points based on risk and other factors."""
         negotiation_points = []
+        if texts_lower is None:
+            texts_lower = [clause.text.lower() for clause in clauses]
+
+        # One pass over the clauses collects every signal; checks already satisfied are skipped
+        has_injunctive_relief = has_liquidated_damages = has_data_return = has_fees = False
+        keyword_points = []
+        for text in texts_lower:
+            has_injunctive_relief = has_injunctive_relief or self.missing_injunctive_relief_pattern.search(text) is not None
+            has_liquidated_damages = has_liquidated_damages or self.missing_liquidated_damages_pattern.search(text) is not None
+            has_data_return = has_data_return or "data-return" in text
+            has_fees = has_fees or "fee" in text
+            # Other negotiation points based on keyword matches, one per matching clause
+            if "liability" in text:
+                keyword_points.append("Limit the Provider's Liability")
+            if "termination" in text:
+                keyword_points.append("Balance Termination Rights for both parties")
 
         # Prioritize based on patterns first
-        if any(re.search(self.missing_injunctive_relief_pattern, clause.text.lower()) is None for clause in clauses):
+        # Missing only when no clause of the contract provides it; one such clause is enough
+        if texts_lower and not has_injunctive_relief:
             negotiation_points.append("Add injunctive relief / equitable remedies")
-        if any("data-return" in clause.text.lower() for clause in clauses):
+        if texts_lower and not has_liquidated_damages:
+            negotiation_points.append("Add liquidated damages for breaches")
+        if has_data_return:
             negotiation_points.append("Ensure data-return/destroy timelines are clear and reasonable")
         # Removed 'hidden' from list, and just keep it as 'removal of fees'
-        if any("fee" in clause.text.lower() for clause in clauses):
+        if has_fees:
             negotiation_points.append("Removal of hidden/unilateral fees")
-
-
-        # Add other negotiation points based on keyword matches
-        for clause in clauses:
-            if "liability" in clause.text.lower() and "Consider limiting liability" not in negotiation_points:
-                negotiation_points.append("Limit the Provider's Liability")
-            if "termination" in clause.text.lower() and "Ensure termination rights" not in negotiation_points:
-                negotiation_points.append("Balance Termination Rights for both parties")
-
+        negotiation_points.extend(keyword_points)
 
         return negotiation_points
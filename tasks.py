@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict
+
+from celery import Celery
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.config import settings
+from api.dependencies import get_analysis_pipeline, get_document_retrieval_service
+from core.database import SessionLocal
+from models.contract_orm import ContractORM
+from utils.logging import logger
+
+celery_app = Celery("counselai", broker=settings.celery_broker_url)
+
+
+@celery_app.task(name="tasks.persist_contract")
+def persist_contract_task(contract_dict: Dict) -> int:
+    """
+    Persists an uploaded contract to the database on a Celery worker.
+
+    The worker opens its own session instead of reusing the request-scoped one,
+    which FastAPI closes as soon as the upload response is sent. Once the row
+    exists, the analysis artifacts are computed and stored alongside it so the
+    analysis endpoints only have to read a column.
+
+    Args:
+        contract_dict (Dict): The serialized `Contract` produced by the upload endpoint.
+
+    Returns:
+        int: The ID of the persisted contract.
+    """
+    db = SessionLocal()
+    try:
+        metadata = contract_dict.get("metadata") or {}
+        db_contract = ContractORM(
+            text=contract_dict["text"],
+            contract_metadata=metadata,
+            created_at=metadata.get("created_at") or datetime.utcnow(),
+        )
+        db.add(db_contract)
+        db.commit()
+        db.refresh(db_contract)
+        logger.info(f"Contract persisted to database with ID: {db_contract.id}")
+        _precompute_embedding(db, db_contract)  # Cheap, so the contract becomes searchable first
+        _precompute_analysis(db, db_contract)
+        return db_contract.id
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {e}")
+        db.rollback()
+        raise
+    except Exception:
+        logger.exception("Unexpected error during contract persistence")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _precompute_analysis(db, db_contract: ContractORM) -> None:
+    """Stores the analysis artifacts for a freshly persisted contract; endpoints fall back to on-demand analysis if this fails."""
+    try:
+        analysis = asyncio.run(get_analysis_pipeline().analyze(db_contract.id, db_contract.text))
+        db_contract.clauses_json = [asdict(c) for c in analysis.clauses]
+        db_contract.obligations_json = [asdict(o) for o in analysis.obligations]
+        db_contract.rights_json = [asdict(r) for r in analysis.rights]
+        db_contract.risk_json = asdict(analysis.risk_report)
+        db.commit()
+        logger.info(f"Analysis artifacts stored for contract {db_contract.id}")
+    except Exception:
+        logger.exception(f"Precomputing analysis failed for contract {db_contract.id}")
+        db.rollback()
+
+
+def _precompute_embedding(db, db_contract: ContractORM) -> None:
+    """Stores the similarity-search embedding for a freshly persisted contract."""
+    try:
+        db_contract.embedding = get_document_retrieval_service().embed(db_contract.text)
+        db.commit()
+    except Exception:
+        logger.exception(f"Embedding failed for contract {db_contract.id}")
+        db.rollback()
+
+
+BACKFILL_BATCH_SIZE = 100  # Contracts embedded per commit by the backfill
+
+
+@celery_app.task(name="tasks.backfill_embeddings")
+def backfill_embeddings_task() -> int:
+    """
+    Embeds every stored contract that has no similarity-search embedding yet, such
+    as contracts persisted before embeddings were stored or whose embedding failed.
+    Run it once after upgrading: `celery -A tasks.celery_app call tasks.backfill_embeddings`.
+
+    Returns:
+        int: The number of contracts embedded.
+    """
+    retrieval_service = get_document_retrieval_service()
+    if not retrieval_service.model:
+        logger.warning("Embedding model is not loaded; nothing backfilled.")
+        return 0
+
+    db = SessionLocal()
+    embedded = 0
+    try:
+        last_id = 0
+        while True:
+            batch = db.execute(
+                select(ContractORM)
+                .where(ContractORM.embedding.is_(None), ContractORM.id > last_id)
+                .order_by(ContractORM.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).scalars().all()
+            if not batch:
+                break
+            for db_contract in batch:
+                db_contract.embedding = retrieval_service.embed(db_contract.text)
+            db.commit()
+            embedded += len(batch)
+            last_id = batch[-1].id
+            logger.info(f"Backfilled embeddings for {embedded} contracts")
+        return embedded
+    except Exception:
+        logger.exception("Embedding backfill failed")
+        db.rollback()
+        raise
+    finally:
+        db.close()
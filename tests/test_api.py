@@ -1,12 +1,35 @@
+from unittest.mock import Mock
+
+import diskcache
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from kombu.exceptions import OperationalError
+from api import routers
+from services import document_upload
+from core.security import get_current_user
 from main import app
 from core.config import settings
 
-client = TestClient(app)
 
 
-def test_health_endpoint():
+# pytest.ini runs every test and fixture in one session-wide event loop
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """An async client that calls the app in-process, shared by the whole test session."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def authenticated():
+    """Lets requests through `get_current_user` without a token."""
+    app.dependency_overrides[get_current_user] = lambda: None
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_health_endpoint(client):
     """
     Tests the /health endpoint.
 
@@ -17,11 +40,11 @@ def test_health_endpoint():
     To improve the accuracy of this test:
     1. Add more assertions to check for different responses.
     """
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
-def test_analyze_endpoint():
+async def test_analyze_endpoint(client):
     """
     Tests the /analyze endpoint.
 
@@ -37,12 +60,12 @@ def test_analyze_endpoint():
         "documentText": "This is a test contract. It has some clauses.",
         "contractType": "NDA"
     }
-    response = client.post("/analyze", json=sample_data)
+    response = await client.post("/analyze", json=sample_data)
     assert response.status_code == 200
     # Add more assertions here to check the structure of the AI's response
 
 
-def test_upload_contract_endpoint():
+async def test_upload_contract_endpoint(client):
     """
     Tests the /contracts endpoint.
 
@@ -57,5 +80,61 @@ def test_upload_contract_endpoint():
     """
     # Test only for successful status and not file operations
     files = {'file': ('test.txt', b'test content', 'text/plain')}
-    response = client.post("/contracts", files=files)
+    response = await client.post("/contracts", files=files)
     assert response.status_code != 403 # this fails without auth but succeeds if we don't assert auth
+
+
+async def test_upload_contract_queues_persistence(client, authenticated, monkeypatch):
+    """
+    Tests that an accepted upload is handed to the Celery worker for persistence.
+
+    To alter this test:
+    1. Change the uploaded file to test a different file type.
+    """
+    delay = Mock()
+    monkeypatch.setattr(routers.persist_contract_task, "delay", delay)
+    files = {'file': ('test.txt', b'This Agreement shall be governed by the laws of Delaware.', 'text/plain')}
+    response = await client.post("/contracts", files=files)
+    assert response.status_code == 200
+    delay.assert_called_once()
+    assert delay.call_args.args[0]["text"] == response.json()["text"]
+
+
+async def test_upload_contract_broker_unavailable(client, authenticated, monkeypatch):
+    """
+    Tests that an upload answers 503, not 500, when the Celery broker can't be reached.
+
+    To alter this test:
+    1. Change the broker error raised by the patched `delay`.
+    """
+    monkeypatch.setattr(routers.persist_contract_task, "delay", Mock(side_effect=OperationalError("broker down")))
+    files = {'file': ('test.txt', b'This Agreement shall be governed by the laws of Delaware.', 'text/plain')}
+    response = await client.post("/contracts", files=files)
+    assert response.status_code == 503
+
+
+async def test_upload_contracts_bulk(client, authenticated, monkeypatch, tmp_path):
+    """
+    Tests that a bulk upload extracts every file and queues each contract for persistence.
+
+    To alter this test:
+    1. Mix in PDF or DOCX files to exercise the other extractors in the worker processes.
+    """
+    delay = Mock()
+    monkeypatch.setattr(routers.persist_contract_task, "delay", delay)
+    # A fresh document cache, so both files really go through the worker processes
+    monkeypatch.setattr(document_upload, "_document_cache", diskcache.Cache(str(tmp_path / "documents")))
+    files = [
+        ('files', ('first.txt', b'This Agreement shall renew automatically.', 'text/plain')),
+        ('files', ('second.txt', b'The Supplier shall indemnify the Customer.', 'text/plain')),
+    ]
+    try:
+        response = await client.post("/contracts/bulk", files=files)
+    finally:
+        document_upload.shutdown_process_pool()  # The lifespan shutdown hook doesn't run under ASGITransport
+    assert response.status_code == 200
+    assert [contract["text"] for contract in response.json()] == [
+        "This Agreement shall renew automatically.",
+        "The Supplier shall indemnify the Customer.",
+    ]
+    assert delay.call_count == 2
@@ -0,0 +1,36 @@
+import pytest
+
+import services.clause_extraction as clause_extraction
+from core.config import settings
+from models.clause import Clause
+from services.clause_extraction import ClauseExtractionService
+
+
+@pytest.fixture
+def extraction_service(monkeypatch, tmp_path):
+    """A clause extraction service with the rule-based segmenter and no transformer classifier."""
+    def no_model(*args, **kwargs):
+        raise RuntimeError("model loading disabled in tests")
+
+    monkeypatch.setattr(clause_extraction, "pipeline", no_model)
+    monkeypatch.setattr(settings, "sentence_segmenter", "sentencizer")
+    monkeypatch.setattr(settings, "classifier_backend", "torch")
+    monkeypatch.setattr(settings, "segment_cache_dir", str(tmp_path / "segments"))
+    return ClauseExtractionService()
+
+
+def test_clause_graph_resolves_references_separately(extraction_service):
+    """
+    Tests that the clause graph stores resolved clause IDs in `resolved_ids`
+    and leaves the raw section numbers in `references` untouched.
+
+    To alter this test:
+    1. Change the references to test other section numbering.
+    """
+    clauses = [
+        Clause(id=i, type="unknown", text=f"Clause {i + 1}.", precision_score=0.0, risk_score=0.0, references=refs, party="")
+        for i, refs in enumerate([["2", "9"], [], ["1"]])
+    ]
+    extraction_service.build_clause_graph(clauses)
+    assert [clause.references for clause in clauses] == [["2", "9"], [], ["1"]]
+    assert [clause.resolved_ids for clause in clauses] == [[1], [], [0]]
@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import services.document_retrieval as document_retrieval
+from core.config import settings
+from core.database import Base
+from models.contract_orm import ContractORM
+from services.document_retrieval import EMBEDDING_DTYPE, DocumentRetrievalService
+
+
+def _embedding(axis: int) -> bytes:
+    """A unit vector along `axis`, stored the way `DocumentRetrievalService.embed` stores it."""
+    vector = np.zeros(4, dtype=EMBEDDING_DTYPE)
+    vector[axis] = 1
+    return vector.tobytes()
+
+
+@pytest.fixture
+def retrieval_service(monkeypatch, tmp_path):
+    """A retrieval service with no embedding model; indexing only reads stored embeddings."""
+    def no_model(*args, **kwargs):
+        raise RuntimeError("model loading disabled in tests")
+
+    monkeypatch.setattr(document_retrieval, "SentenceTransformer", no_model)
+    monkeypatch.setattr(settings, "embedding_backend", "torch")
+    monkeypatch.setattr(settings, "retrieval_index", "exact")
+    monkeypatch.setattr(settings, "embedding_cache_dir", str(tmp_path / "embeddings"))
+    return DocumentRetrievalService()
+
+
+def test_refresh_indexes_late_and_concurrent_embeddings(retrieval_service):
+    """
+    Tests that contracts embedded out of ID order are still indexed, and that
+    concurrent refreshes don't index the same contract twice.
+
+    To alter this test:
+    1. Change the order in which the contracts receive their embeddings.
+
+    To improve the accuracy of this test:
+    1. Cover the HNSW index as well.
+    """
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = async_sessionmaker(engine)
+
+            # Contract 1 is still being embedded when contract 2 already has its embedding
+            async with sessions() as db:
+                db.add_all([ContractORM(text="first"), ContractORM(text="second", embedding=_embedding(2))])
+                await db.commit()
+            async with sessions() as db1, sessions() as db2:
+                await asyncio.gather(
+                    retrieval_service._refresh_embeddings(db1),
+                    retrieval_service._refresh_embeddings(db2),
+                )
+            assert retrieval_service._ids.tolist() == [2]
+
+            async with sessions() as db:
+                contract = await db.get(ContractORM, 1)
+                contract.embedding = _embedding(1)
+                await db.commit()
+                await retrieval_service._refresh_embeddings(db)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+    assert sorted(retrieval_service._ids.tolist()) == [1, 2]
+    assert retrieval_service._matrix.shape == (2, 4)
+    assert retrieval_service._rank(np.array([0, 1, 0, 0], dtype=np.float32), 1, None) == [1]
+
+
+def test_retrieve_loads_only_returned_columns(retrieval_service):
+    """
+    Tests that similar contracts are returned best first, and that loading them
+    skips the embedding and analysis JSON columns.
+
+    To alter this test:
+    1. Change the stored embeddings to test a different ranking.
+    """
+    statements = []
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = async_sessionmaker(engine)
+            async with sessions() as db:
+                db.add_all([
+                    ContractORM(text="first", embedding=_embedding(1), clauses_json=[{"id": 0}]),
+                    ContractORM(text="second", embedding=_embedding(2), clauses_json=[{"id": 0}]),
+                ])
+                await db.commit()
+            retrieval_service.model = object()  # Only checked for presence; the query embedding is given
+            async with sessions() as db:
+                return await retrieval_service.retrieve_similar_documents(
+                    "query", top_n=1, db=db, query_embedding=_embedding(2)
+                )
+        finally:
+            await engine.dispose()
+
+    contracts = asyncio.run(scenario())
+    assert [(contract.id, contract.text) for contract in contracts] == [(2, "second")]
+    load_statement = statements[-1]
+    assert "contracts.text" in load_statement
+    assert "embedding" not in load_statement and "clauses_json" not in load_statement
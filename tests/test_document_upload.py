@@ -0,0 +1,57 @@
+import pytest
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+
+from services.document_upload import _stream_docx_text, extract_text_from_docx
+
+
+@pytest.fixture
+def contract_docx(tmp_path):
+    """A DOCX with tabs, line and page breaks, a hyperlink and a table."""
+    document = Document()
+    document.add_heading("Master Services Agreement", level=1)
+    paragraph = document.add_paragraph("1. Term.")
+    run = paragraph.add_run(" This Agreement")
+    run.add_tab()
+    run.add_text("renews yearly.")
+    run.add_break()
+    run.add_text("Unless terminated.")
+    run.add_break(WD_BREAK.PAGE)
+
+    # Hyperlinked runs are part of the paragraph text
+    hyperlink = OxmlElement("w:hyperlink")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = " See the SLA."
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    paragraph._p.append(hyperlink)
+
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Fees"
+    table.cell(1, 1).text = "Payable within 30 days"
+    document.add_paragraph("2. Governing Law. This Agreement is governed by the laws of Delaware.")
+    document.add_paragraph("")
+
+    path = tmp_path / "contract.docx"
+    document.save(path)
+    return str(path)
+
+
+def test_streamed_docx_text_matches_python_docx(contract_docx):
+    """
+    Tests that the streaming DOCX parser returns exactly the text of the
+    python-docx fallback, so clause IDs and cache keys don't depend on which ran.
+
+    To alter this test:
+    1. Add more WordprocessingML elements to the fixture document.
+
+    To improve the accuracy of this test:
+    1. Compare against real-world contract DOCX files.
+    """
+    expected = "\n".join(paragraph.text for paragraph in Document(contract_docx).paragraphs)
+    assert _stream_docx_text(contract_docx) == expected
+    assert extract_text_from_docx(contract_docx) == expected
+    assert "See the SLA." in expected and "Fees" not in expected
+
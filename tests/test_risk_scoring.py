@@ -0,0 +1,88 @@
+import pytest
+
+import services.risk_scoring as risk_scoring
+from core.config import settings
+from models.clause import Clause
+from services.risk_scoring import RiskScoringService
+
+INJUNCTIVE_RELIEF_POINT = "Add injunctive relief / equitable remedies"
+LIQUIDATED_DAMAGES_POINT = "Add liquidated damages for breaches"
+
+
+def _clause(clause_id: int, text: str) -> Clause:
+    """A clause of unknown type with the given text."""
+    return Clause(id=clause_id, type="unknown", text=text, precision_score=0.0, risk_score=0.0, references=[], party="")
+
+
+@pytest.fixture
+def risk_service(monkeypatch):
+    """A risk scoring service without the transformer, so only keywords and patterns apply."""
+    def no_model(*args, **kwargs):
+        raise RuntimeError("model loading disabled in tests")
+
+    monkeypatch.setattr(risk_scoring, "pipeline", no_model)
+    monkeypatch.setattr(settings, "risk_backend", "torch")
+    return RiskScoringService()
+
+
+def test_negotiation_points_skip_remedies_one_clause_provides(risk_service):
+    """
+    Tests that injunctive relief and liquidated damages aren't requested when
+    any single clause of the contract already provides them.
+
+    To alter this test:
+    1. Change the clause texts to test other negotiation points.
+    """
+    clauses = [
+        _clause(1, "The Supplier shall deliver the Services."),
+        _clause(2, "The Discloser is entitled to injunctive relief for any breach."),
+        _clause(3, "Late delivery incurs liquidated damages of 1% per week."),
+    ]
+    points = risk_service.get_negotiation_points(clauses)
+    assert INJUNCTIVE_RELIEF_POINT not in points
+    assert LIQUIDATED_DAMAGES_POINT not in points
+
+
+def test_negotiation_points_request_missing_remedies(risk_service):
+    """
+    Tests that injunctive relief and liquidated damages are requested, once each,
+    when no clause provides them, and that an empty contract gets no points.
+
+    To alter this test:
+    1. Change the clause texts to test other negotiation points.
+    """
+    clauses = [
+        _clause(1, "The Supplier shall deliver the Services."),
+        _clause(2, "Either party may terminate for convenience."),
+    ]
+    points = risk_service.get_negotiation_points(clauses)
+    assert points.count(INJUNCTIVE_RELIEF_POINT) == 1
+    assert points.count(LIQUIDATED_DAMAGES_POINT) == 1
+    assert risk_service.get_negotiation_points([]) == []
+
+
+def test_failed_analyzer_call_is_not_cached(risk_service):
+    """
+    Tests that a clause scored by keywords after a failed analyzer call is
+    assessed by the transformer again on the next call, not served from the cache.
+
+    To alter this test:
+    1. Change the analyzer results returned after the failure.
+    """
+    calls = []
+
+    def flaky_analyzer(windows, **kwargs):
+        calls.append(len(windows))
+        if len(calls) == 1:
+            raise RuntimeError("transient analyzer error")
+        return [{"label": "High Risk", "score": 0.9} for _ in windows]
+
+    risk_service.risk_analyzer = flaky_analyzer
+    clause = _clause(1, "The Supplier shall indemnify the Customer against all claims.")
+
+    first = risk_service.calculate_clause_risk(clause)
+    assert not any(factor.startswith("Transformer") for factor in first["factors"])
+
+    second = risk_service.calculate_clause_risk(clause)
+    assert "Transformer: High Risk (0.90)" in second["factors"]
+    assert calls == [1, 1]
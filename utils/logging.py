@@ -1,10 +1,48 @@
+import atexit
 import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-# Basic logger configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from core.config import settings
+
+# Records are queued and written out by a listener thread, so stream I/O
+# never blocks the request thread.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+
+def _start_listener() -> QueueListener:
+    """Starts a listener thread writing queued records to stderr."""
+    listener = QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+_listener = _start_listener()
+
+
+def _stop_listener() -> None:
+    """Writes out any queued records and stops the listener; runs at interpreter exit."""
+    _listener.stop()
+
+
+def _restart_listener_in_child() -> None:
+    """Starts a fresh listener in forked workers (e.g. Celery prefork), which don't inherit its thread."""
+    global _listener
+    while not _log_queue.empty():  # The parent still writes whatever was queued at fork time
+        _log_queue.get_nowait()
+    _listener = _start_listener()
+
+
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+# Every logger, ours and third-party, logs through the queue via the root logger
+_root_logger = logging.getLogger()
+_root_logger.setLevel(settings.log_level)
+_root_logger.addHandler(QueueHandler(_log_queue))
 
 # Create a logger that can be imported
-logger = logging.getLogger('my_app')
\ No newline at end of file
+logger = logging.getLogger('my_app')
@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+import spacy
+from spacy.language import Language
+
+from utils.logging import logger
+
+DEFAULT_SPACY_MODEL = "en_core_web_lg"
+# Everything but tok2vec and the dependency parser, for callers that only read `token.dep_`
+PARSER_ONLY_EXCLUDE = ("tagger", "attribute_ruler", "lemmatizer", "ner")
+
+
+@lru_cache(maxsize=None)
+def get_nlp(name: str = DEFAULT_SPACY_MODEL, exclude: tuple = ()) -> Language:
+    """
+    Loads a spaCy pipeline once per process and returns the shared instance, so
+    services that need the same model don't each hold a copy (~700MB for
+    en_core_web_lg). Downloads the model first if it isn't installed.
+
+    Args:
+        name (str): The spaCy model package to load.
+        exclude (tuple): Pipeline components not to load at all; callers asking
+            for the same components share one instance.
+
+    Returns:
+        Language: The loaded pipeline.
+    """
+    try:
+        nlp = spacy.load(name, exclude=list(exclude))
+    except OSError:
+        logger.warning(f"Downloading {name} spaCy model...")
+        spacy.cli.download(name)
+        nlp = spacy.load(name, exclude=list(exclude))
+    logger.info(f"spaCy model {name} loaded with pipes {nlp.pipe_names}.")
+    return nlp
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from core.config import settings
+from utils.logging import logger
+
+# ONNX files written next to each other in a model's export directory
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer_config.json"
+
+
+def load_ort_model(model_cls, model_id: str, export_dir: Path, provider: str, quantize: bool):
+    """
+    Loads a Hugging Face model as an optimum ONNX Runtime model, exporting it to
+    `export_dir` on first use.
+
+    With `quantize`, the exported weights are dynamically quantized to int8 once
+    (half the weight bytes, VNNI int8 GEMMs on modern x86) and the int8 file is
+    loaded instead. Quantization only pays off on the CPU execution provider.
+    CPU sessions use `settings.torch_num_threads` intra-op threads, like torch models.
+
+    Args:
+        model_cls: The optimum ORTModel class to load, e.g. `ORTModelForSequenceClassification`.
+        model_id (str): The Hugging Face model to export.
+        export_dir (Path): Where the ONNX files are kept (and the tokenizer, by `load_ort_tokenizer`).
+        provider (str): The ONNX Runtime execution provider.
+        quantize (bool): Whether to load the int8 variant.
+
+    Returns:
+        The loaded ORTModel.
+    """
+    if not (export_dir / FP32_FILE).exists():
+        logger.info(f"Exporting {model_id} to ONNX in {export_dir}...")
+        model_cls.from_pretrained(model_id, export=True).save_pretrained(export_dir)
+
+    file_name = FP32_FILE
+    if quantize:
+        if not (export_dir / INT8_FILE).exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing {model_id} to int8...")
+            quantize_dynamic(export_dir / FP32_FILE, export_dir / INT8_FILE, weight_type=QuantType.QInt8)
+        file_name = INT8_FILE
+
+    session_options = None
+    if provider == "CPUExecutionProvider":
+        from onnxruntime import SessionOptions
+
+        session_options = SessionOptions()
+        session_options.intra_op_num_threads = settings.torch_num_threads
+
+    return model_cls.from_pretrained(
+        export_dir, file_name=file_name, provider=provider, session_options=session_options
+    )
+
+
+def load_ort_tokenizer(model_id: str, export_dir: Path):
+    """
+    Loads the fast tokenizer kept next to a model's ONNX export, saving it there
+    from the Hugging Face Hub on first use so later loads work offline.
+
+    Args:
+        model_id (str): The Hugging Face model whose tokenizer to use.
+        export_dir (Path): The model's ONNX export directory.
+
+    Returns:
+        The loaded tokenizer.
+    """
+    from transformers import AutoTokenizer
+
+    if not (export_dir / TOKENIZER_FILE).exists():
+        logger.info(f"Saving the {model_id} tokenizer to {export_dir}...")
+        AutoTokenizer.from_pretrained(model_id, use_fast=True).save_pretrained(export_dir)
+    return AutoTokenizer.from_pretrained(export_dir, use_fast=True)